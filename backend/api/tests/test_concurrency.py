@@ -0,0 +1,120 @@
+from datetime import timedelta
+from threading import Barrier, Thread
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TransactionTestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from tasks.models import Task
+from users.models import Position, User, UserRole
+
+THREADS = 8
+
+
+@skipUnless(
+    connection.vendor == 'postgresql',
+    'Проверка конкурентного доступа требует PostgreSQL.',
+)
+class ReviewTaskConcurrencyTest(TransactionTestCase):
+    """
+    Параллельная проверка задач тимлидами.
+    """
+
+    def setUp(self):
+        self.team_leader = User.objects.create(
+            email='team@mail.ru',
+            first_name='Lid',
+            last_name='Lidov',
+            password='password',
+            role=UserRole.TEAMLEADER,
+            position=Position.SENIOR,
+            is_active=True,
+        )
+        self.executor = User.objects.create(
+            email='test@mail.ru',
+            first_name='User',
+            last_name='Userov',
+            password='password',
+            position=Position.JUNIOR,
+            is_active=True,
+        )
+
+    def create_task(self, reward_points=10):
+        return Task.objects.create(
+            title='Задача',
+            description='Описание',
+            deadline=timezone.now() + timedelta(days=1),
+            reward_points=reward_points,
+            team_leader=self.team_leader,
+            assigned_to=self.executor,
+            status=Task.SENT,
+        )
+
+    def approve_in_parallel(self, task_ids):
+        barrier = Barrier(len(task_ids))
+        responses = []
+
+        def approve(task_id):
+            client = APIClient()
+            client.force_authenticate(user=self.team_leader)
+            barrier.wait()
+            try:
+                responses.append(
+                    client.post(
+                        f'/api/tasks/{task_id}/review_task/',
+                        {'review_status': Task.APPROVED},
+                    )
+                )
+            finally:
+                connection.close()
+
+        threads = [
+            Thread(target=approve, args=(task_id,)) for task_id in task_ids
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return responses
+
+    def test_parallel_approvals_of_different_tasks(self):
+        """
+        N параллельных принятий дают ровно N начислений.
+        """
+        tasks = [
+            self.create_task(reward_points=number + 1)
+            for number in range(THREADS)
+        ]
+        responses = self.approve_in_parallel([task.id for task in tasks])
+        self.assertTrue(
+            all(
+                response.status_code == status.HTTP_200_OK
+                for response in responses
+            )
+        )
+        self.executor.refresh_from_db()
+        expected_points = sum(task.reward_points for task in tasks)
+        self.assertEqual(self.executor.completed_tasks_count, THREADS)
+        self.assertEqual(self.executor.reward_points, expected_points)
+        self.assertEqual(
+            self.executor.reward_points_for_current_month, expected_points
+        )
+
+    def test_parallel_approvals_of_same_task(self):
+        """
+        Одна и та же задача принимается и начисляется только один раз.
+        """
+        task = self.create_task()
+        responses = self.approve_in_parallel([task.id] * THREADS)
+        succeeded = [
+            response
+            for response in responses
+            if response.status_code == status.HTTP_200_OK
+        ]
+        self.assertEqual(len(succeeded), 1)
+        self.executor.refresh_from_db()
+        self.assertEqual(self.executor.completed_tasks_count, 1)
+        self.assertEqual(self.executor.reward_points, task.reward_points)
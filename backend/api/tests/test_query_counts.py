@@ -0,0 +1,378 @@
+import os
+
+from datetime import timedelta
+from time import perf_counter
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from department.models import Department
+from notifications.models import Notification
+from tasks.models import Task
+from users.authentication import token_cache
+from users.models import (
+    Achievement,
+    Contact,
+    Hardskill,
+    Position,
+    User,
+    UserAchievement,
+    UserRole,
+)
+
+# Оба объема меньше размера страницы, чтобы рост данных был виден
+# в ответе, а не отрезался пагинацией.
+SMALL = 2
+LARGE = 10
+
+
+class QueryCountTest(TestCase):
+    """
+    Число запросов к базе на каждом эндпоинте не должно расти вместе
+    с объемом данных или размером пакета и не должно превышать бюджет
+    эндпоинта. Таблица замеров печатается при QUERY_COUNT_REPORT=1.
+    """
+
+    results: list[tuple] = []
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.results = []
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        if not cls.results or not os.getenv('QUERY_COUNT_REPORT'):
+            return
+        print(
+            '\n{:<40} {:>6} {:>6} {:>7} {:>10} {:>10}'.format(
+                'endpoint', SMALL, LARGE, 'budget', 'ms small', 'ms large'
+            )
+        )
+        for name, small, large, budget, small_ms, large_ms in sorted(
+            cls.results
+        ):
+            print(
+                f'{name:<40} {small:>6} {large:>6} {budget:>7} '
+                f'{small_ms:>10.1f} {large_ms:>10.1f}'
+            )
+
+    def setUp(self):
+        self.department = Department.objects.create(name='backend')
+        self.achievement = Achievement.objects.create(
+            name='Качество работы', value=10
+        )
+        self.hardskills = [
+            Hardskill.objects.create(name=name)
+            for name in ('Python', 'Django', 'SQL')
+        ]
+        self.team_leader = self.create_user(
+            'team@mail.ru', role=UserRole.TEAMLEADER
+        )
+        self.task = Task.objects.create(
+            title='Задача',
+            description='Описание',
+            deadline=timezone.now() + timedelta(days=1),
+            reward_points=10,
+            team_leader=self.team_leader,
+            assigned_to=self.team_leader,
+            department=self.department,
+        )
+        token = Token.objects.create(user=self.team_leader)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        self.seeded = 0
+
+    def create_user(self, email, role=UserRole.USER):
+        user = User.objects.create(
+            email=email,
+            first_name='User',
+            last_name='Userov',
+            password='password',
+            role=role,
+            position=Position.JUNIOR,
+            is_active=True,
+            department=self.department,
+        )
+        Contact.objects.create(user=user, telegram='@user')
+        user.hardskills.add(*self.hardskills)
+        UserAchievement.objects.create(user=user, achievement=self.achievement)
+        return user
+
+    def seed(self, count):
+        """Догоняет количество исполнителей, задач и уведомлений до count."""
+        for number in range(self.seeded, count):
+            user = self.create_user(f'user{number}@mail.ru')
+            Task.objects.create(
+                title=f'Задача {number}',
+                description='Описание',
+                deadline=timezone.now() + timedelta(days=1),
+                reward_points=10,
+                team_leader=self.team_leader,
+                assigned_to=user,
+                department=self.department,
+                status=Task.APPROVED if number % 2 else Task.CREATED,
+            )
+            Notification.objects.create(
+                user=self.team_leader, message=f'Уведомление {number}'
+            )
+        self.seeded = count
+
+    def measure(self, url, warm=False, method='get', data=None):
+        """
+        Запросы и время одного запроса. С warm=True кэши перед замером
+        заполняются тем же GET.
+        """
+        cache.clear()
+        token_cache.clear()
+        if warm:
+            self.client.get(url)
+        with CaptureQueriesContext(connection) as context:
+            start = perf_counter()
+            if method == 'get':
+                response = self.client.get(url)
+            else:
+                response = getattr(self.client, method)(
+                    url, data, format='json'
+                )
+            if response.streaming:
+                b''.join(response.streaming_content)
+            elapsed = (perf_counter() - start) * 1000
+        self.assertIn(
+            response.status_code,
+            (status.HTTP_200_OK, status.HTTP_201_CREATED),
+            url,
+        )
+        return len(context.captured_queries), elapsed
+
+    def assert_query_budget(self, name, url, budget, warm=False):
+        self.seed(SMALL)
+        small, small_ms = self.measure(url, warm)
+        self.seed(LARGE)
+        large, large_ms = self.measure(url, warm)
+        self.check_budget(name, budget, small, large, small_ms, large_ms)
+
+    def assert_write_budget(self, name, method, get_request, budget):
+        """
+        Бюджет запроса на запись. get_request(count) готовит данные и
+        возвращает (url, тело запроса) для пакета из count элементов.
+        """
+        url, data = get_request(SMALL)
+        small, small_ms = self.measure(url, method=method, data=data)
+        url, data = get_request(LARGE)
+        large, large_ms = self.measure(url, method=method, data=data)
+        self.check_budget(name, budget, small, large, small_ms, large_ms)
+
+    def check_budget(self, name, budget, small, large, small_ms, large_ms):
+        self.results.append((name, small, large, budget, small_ms, large_ms))
+        self.assertEqual(
+            small, large, f'{name}: число запросов растет с объемом данных'
+        )
+        self.assertLessEqual(large, budget, f'{name}: превышен бюджет')
+
+    def test_users_list(self):
+        self.assert_query_budget('GET /api/users/', '/api/users/', 2)
+
+    def test_users_list_all_fields(self):
+        self.assert_query_budget(
+            'GET /api/users/?fields=...',
+            '/api/users/?fields=id,hardskills,achievements,contacts,'
+            'department,total_tasks,remaining_tasks_count',
+            4,
+        )
+
+    def test_users_retrieve(self):
+        self.assert_query_budget(
+            'GET /api/users/{id}/', f'/api/users/{self.team_leader.id}/', 4
+        )
+
+    def test_users_me(self):
+        self.assert_query_budget('GET /api/users/me/', '/api/users/me/', 5)
+
+    def test_users_by_skills(self):
+        self.assert_query_budget(
+            'GET /api/users/by_skills/',
+            '/api/users/by_skills/?all=python,django',
+            2,
+        )
+
+    def test_hardskills(self):
+        self.assert_query_budget(
+            'GET /api/hardskills/', '/api/hardskills/?q=p', 3
+        )
+
+    def test_hardskills_cached(self):
+        self.assert_query_budget(
+            'GET /api/hardskills/ (кэш)', '/api/hardskills/?q=p', 1, True
+        )
+
+    def test_users_progress(self):
+        self.assert_query_budget(
+            'GET /api/users/progress/', '/api/users/progress/', 2
+        )
+
+    def test_current_user_info(self):
+        self.assert_query_budget(
+            'GET /api/curent_user_info/', '/api/curent_user_info/', 4
+        )
+
+    def test_leaderboard(self):
+        self.assert_query_budget(
+            'GET /api/leaderboard/', '/api/leaderboard/', 2
+        )
+
+    def test_achivements_list(self):
+        self.assert_query_budget(
+            'GET /api/achivements/', '/api/achivements/', 2
+        )
+
+    def test_tasks_list(self):
+        self.assert_query_budget('GET /api/tasks/', '/api/tasks/', 2)
+
+    def test_tasks_retrieve(self):
+        self.assert_query_budget(
+            'GET /api/tasks/{id}/', f'/api/tasks/{self.task.id}/', 2
+        )
+
+    def test_tasks_export(self):
+        self.assert_query_budget(
+            'GET /api/tasks/export/', '/api/tasks/export/', 2
+        )
+
+    def test_notifications_list(self):
+        self.assert_query_budget(
+            'GET /api/notifications/', '/api/notifications/', 2
+        )
+
+    def test_my_notifications(self):
+        self.assert_query_budget(
+            'GET /api/user/my_notifications/', '/api/user/my_notifications/', 2
+        )
+
+    def get_executors(self):
+        """
+        Исполнители пакетов записи. Их число постоянно: строки статистики
+        и счетчики исполнителя обновляются по одному запросу на
+        исполнителя, а бюджет проверяет рост с размером пакета.
+        """
+        return list(
+            User.objects.filter(role=UserRole.USER).order_by('id')[:SMALL]
+        )
+
+    def sent_tasks(self, count):
+        """count задач на проверке."""
+        self.seed(count)
+        executors = self.get_executors()
+        return [
+            Task.objects.create(
+                title='На проверке',
+                description='Описание',
+                deadline=timezone.now() + timedelta(days=1),
+                reward_points=10,
+                team_leader=self.team_leader,
+                assigned_to=executors[number % SMALL],
+                department=self.department,
+                status=Task.SENT,
+            )
+            for number in range(count)
+        ]
+
+    def test_review_task(self):
+        def get_request(count):
+            task = self.sent_tasks(count)[0]
+            return (
+                f'/api/tasks/{task.id}/review_task/',
+                {'review_status': Task.APPROVED},
+            )
+
+        self.assert_write_budget(
+            'POST /api/tasks/{id}/review_task/', 'post', get_request, 10
+        )
+
+    def test_review_batch(self):
+        def get_request(count):
+            return '/api/tasks/review_batch/', [
+                {
+                    'task': task.id,
+                    'review_status': (
+                        Task.APPROVED if number % 2 else Task.RETURNED
+                    ),
+                }
+                for number, task in enumerate(self.sent_tasks(count))
+            ]
+
+        self.assert_write_budget(
+            'POST /api/tasks/review_batch/', 'post', get_request, 12
+        )
+
+    def test_tasks_bulk(self):
+        def get_request(count):
+            self.seed(count)
+            executors = self.get_executors()
+            return '/api/tasks/bulk/', [
+                {
+                    'title': f'Задача спринта {number}',
+                    'description': 'Описание',
+                    'deadline': timezone.now() + timedelta(days=1),
+                    'department': self.department.name,
+                    'reward_points': 10,
+                    'assigned_to': executors[number % SMALL].id,
+                }
+                for number in range(count)
+            ]
+
+        self.assert_write_budget(
+            'POST /api/tasks/bulk/', 'post', get_request, 8
+        )
+
+    def test_add_achievements(self):
+        def get_request(count):
+            self.seed(count)
+            user = User.objects.filter(role=UserRole.USER).first()
+            return f'/api/users/{user.id}/add_achievements/', {
+                'achievements': [
+                    {'name': f'Достижение {count} {number}', 'value': 5}
+                    for number in range(count)
+                ]
+            }
+
+        self.assert_write_budget(
+            'PATCH /api/users/{id}/add_achievements/',
+            'patch',
+            get_request,
+            15,
+        )
+
+    def test_add_achievements_bulk(self):
+        def get_request(count):
+            self.seed(count)
+            users = User.objects.filter(role=UserRole.USER).order_by('id')
+            return '/api/users/add_achievements/', {
+                'users': [user.id for user in users[:count]],
+                'achievements': [{'name': f'Достижение {count}', 'value': 5}],
+            }
+
+        self.assert_write_budget(
+            'POST /api/users/add_achievements/', 'post', get_request, 12
+        )
+
+    def test_profile_update(self):
+        def get_request(count):
+            self.seed(count)
+            return f'/api/users/{self.team_leader.id}/', {
+                'hardskills': [
+                    {'name': f'Навык {count} {number}'}
+                    for number in range(count)
+                ]
+            }
+
+        self.assert_write_budget(
+            'PATCH /api/users/{id}/', 'patch', get_request, 15
+        )
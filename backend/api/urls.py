@@ -7,12 +7,16 @@ from tasks.views import TaskViewSet
 from users.views import (
     AchivementsViewSet,
     CustomDjUserViewSet,
+    HardskillViewSet,
+    LeaderboardViewSet,
     ShortUserProfileViewSet,
+    TokenCacheStatsViewSet,
 )
 
 router = DefaultRouter()
 router.register(r'users', CustomDjUserViewSet, basename='users')
 router.register(r'achivements', AchivementsViewSet, basename='achivements')
+router.register(r'hardskills', HardskillViewSet, basename='hardskills')
 router.register(r'tasks', TaskViewSet, basename='tasks')
 router.register(
     r'notifications', UserNotificationsViewSet, basename='user-notifications'
@@ -28,6 +32,16 @@ urlpatterns = [
         ShortUserProfileViewSet.as_view({'get': 'list'}),
         name='user_profile_info',
     ),
+    path(
+        'leaderboard/',
+        LeaderboardViewSet.as_view({'get': 'list'}),
+        name='leaderboard',
+    ),
+    path(
+        'token_cache_stats/',
+        TokenCacheStatsViewSet.as_view({'get': 'list'}),
+        name='token_cache_stats',
+    ),
     path(
         'user/my_notifications/',
         UserNotificationsViewSet.as_view({'get': 'list'}),
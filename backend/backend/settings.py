@@ -1,6 +1,7 @@
 import os
 import sys
 
+from datetime import timedelta
 from pathlib import Path
 
 from django.conf import settings
@@ -32,7 +33,7 @@ INSTALLED_APPS = [
     'djoser',
     'drf_spectacular',
     'import_export',
-    'scheduler',
+    'scheduler.apps.SchedulerConfig',
     'api.apps.ApiConfig',
     'users.apps.UsersConfig',
     'news.apps.NewsConfig',
@@ -132,7 +133,7 @@ REST_FRAMEWORK = {
         'django_filters.rest_framework.DjangoFilterBackend'
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.TokenAuthentication',
+        'users.authentication.CachedTokenAuthentication',
     ),
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
@@ -174,6 +175,7 @@ DJOSER = {
         'profile_info': ['rest_framework.permissions.IsAuthenticated'],
     },
     'EMAIL_BACKEND': EMAIL_BACKEND,
+    'TOKEN_MODEL': 'users.models.ExpiringToken',
 }
 
 SPECTACULAR_SETTINGS = {
@@ -186,3 +188,30 @@ CORS_URLS_REGEX = r'^/api/.*$'
 CORS_ALLOWED_ORIGINS = [
     'http://localhost:3000',
 ]
+
+# Хранить места пользователей в рейтинге в отдельной таблице users_userrank.
+# Без нее место считается запросом COUNT по индексу. Таблицу раз в минуту
+# пересчитывает планировщик (run_scheduler), а не запросы, меняющие баллы.
+USER_RANK_TABLE = os.getenv('USER_RANK_TABLE') in TRUE_VALUES
+# Первые страницы рейтинга кэшируются на короткое время.
+LEADERBOARD_CACHE_TIMEOUT = 30
+LEADERBOARD_CACHE_ROWS = 100
+# Подсказки навыков: число вариантов и время кэша числа их пользователей.
+HARDSKILL_AUTOCOMPLETE_LIMIT = 10
+HARDSKILL_USAGE_CACHE_TIMEOUT = 300
+# Кэш прогресса за месяц. Изменение принятых задач сбрасывает его только
+# в кэше своего процесса (по умолчанию LocMemCache), поэтому другие
+# процессы, планировщик и rebuild_task_stats видят старые данные не дольше
+# этого времени, как и у первых страниц рейтинга.
+TASK_PROGRESS_CACHE_TIMEOUT = 30
+# Кэш токенов в памяти процесса, 0 в TOKEN_CACHE_TTL отключает кэш.
+TOKEN_CACHE_SIZE = 10_000
+TOKEN_CACHE_TTL = int(os.getenv('TOKEN_CACHE_TTL', default=60))
+# Срок действия токена с последнего продления, 0 - бессрочные токены.
+# Продление записывается в базу не чаще раза в TOKEN_REFRESH_INTERVAL.
+TOKEN_LIFETIME = timedelta(
+    days=int(os.getenv('TOKEN_LIFETIME_DAYS', default=30))
+)
+TOKEN_REFRESH_INTERVAL = timedelta(hours=1)
+# Аренда ведущего планировщика продлевается каждую треть этого срока.
+SCHEDULER_LEASE_TTL = 60
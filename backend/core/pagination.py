@@ -0,0 +1,302 @@
+import json
+
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.signing import BadSignature, Signer
+from django.db.models import F, Q, Window
+from django.db.models.functions import Rank
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """
+    DjangoJSONEncoder обрезает микросекунды у datetime, а для курсора
+    значение должно совпадать с сохраненным в базе до микросекунды.
+    """
+
+    def default(self, o):
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Курсорная (keyset) пагинация.
+
+    Курсор хранит значения всех полей сортировки последней записи
+    страницы, поэтому следующая страница выбирается условием
+    WHERE (created_at, id) < (...) по индексу, без OFFSET и COUNT(*).
+    Последнее поле сортировки должно быть уникальным.
+    """
+
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    ordering = ('-created_at', '-id')
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(view)
+        self.model = queryset.model
+        reverse, position = self.decode_cursor(request)
+
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(self.invert(field) for field in ordering)
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.get_keyset_q(ordering, position))
+
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+        if reverse:
+            results.reverse()
+
+        if reverse:
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                'next': self.get_next_link(),
+                'previous': self.get_previous_link(),
+                'results': data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Курсор страницы из полей next/previous.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Количество записей на странице.',
+                'schema': {'type': 'integer'},
+            },
+        ]
+
+    def get_ordering(self, view):
+        return getattr(view, 'pagination_ordering', None) or self.ordering
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(False, self.page[-1])
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(True, self.page[0])
+
+    def encode_cursor(self, reverse, instance):
+        position = [
+            getattr(instance, field.lstrip('-')) for field in self.ordering
+        ]
+        return self.get_cursor_link([reverse, position])
+
+    def dump_cursor(self, payload):
+        payload = json.dumps(payload, cls=CursorEncoder)
+        return urlsafe_b64encode(payload.encode()).decode()
+
+    def load_cursor(self, cursor):
+        return json.loads(urlsafe_b64decode(cursor))
+
+    def get_cursor_link(self, payload):
+        cursor = self.dump_cursor(payload)
+        return replace_query_param(
+            remove_query_param(self.base_url, self.cursor_query_param),
+            self.cursor_query_param,
+            cursor,
+        )
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return False, None
+        try:
+            reverse, position = self.load_cursor(encoded)
+            if len(position) != len(self.ordering):
+                raise ValueError
+            position = [
+                self.to_python(field.lstrip('-'), value)
+                for field, value in zip(self.ordering, position)
+            ]
+        except (TypeError, ValueError, ValidationError) as e:
+            raise NotFound(self.invalid_cursor_message) from e
+        return bool(reverse), position
+
+    def to_python(self, name, value):
+        try:
+            field = self.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return value
+        return field.to_python(value)
+
+    def get_keyset_q(self, ordering, position):
+        """
+        Условие «строго после позиции» для составного ключа сортировки:
+        (a < x) OR (a = x AND b < y) OR ...
+        """
+        conditions = []
+        for index, field in enumerate(ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            equal = {
+                prefix.lstrip('-'): value
+                for prefix, value in zip(ordering[:index], position)
+            }
+            conditions.append(
+                Q(**equal, **{f'{name}__{lookup}': position[index]})
+            )
+        return reduce(or_, conditions)
+
+    @staticmethod
+    def invert(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+
+class RankedKeysetPagination(KeysetPagination):
+    """
+    Keyset-пагинация с местом в рейтинге по первому полю сортировки.
+
+    Место считается RANK() OVER только по записям после курсора, поэтому
+    курсор кроме позиции хранит место последней записи и количество уже
+    выданных записей: запись с тем же значением поля получает то же место,
+    остальные — выданные записи плюс место внутри оставшихся.
+    Место и количество берутся из курсора без проверки по базе, поэтому
+    курсор подписывается SECRET_KEY. Листать можно только вперед.
+    """
+
+    rank_attribute = 'rank'
+    cursor_salt = 'core.pagination.RankedKeysetPagination'
+
+    def dump_cursor(self, payload):
+        return Signer(salt=self.cursor_salt).sign(super().dump_cursor(payload))
+
+    def load_cursor(self, cursor):
+        return super().load_cursor(
+            Signer(salt=self.cursor_salt).unsign(cursor)
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(view)
+        self.model = queryset.model
+        position, last_rank, self.offset = self.decode_cursor(request)
+
+        rank_field = self.ordering[0].lstrip('-')
+        order = F(rank_field)
+        order = order.desc() if self.ordering[0].startswith('-') else order
+        queryset = queryset.annotate(
+            page_rank=Window(expression=Rank(), order_by=order)
+        ).order_by(*self.ordering)
+        if position is not None:
+            queryset = queryset.filter(
+                self.get_keyset_q(self.ordering, position)
+            )
+
+        results = list(queryset[: self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        for instance in self.page:
+            if position is not None and (
+                getattr(instance, rank_field) == position[0]
+            ):
+                rank = last_rank
+            else:
+                rank = self.offset + instance.page_rank
+            setattr(instance, self.rank_attribute, rank)
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'results': data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        last = self.page[-1]
+        position = [
+            getattr(last, field.lstrip('-')) for field in self.ordering
+        ]
+        return self.get_cursor_link(
+            [
+                position,
+                getattr(last, self.rank_attribute),
+                self.offset + len(self.page),
+            ]
+        )
+
+    def get_previous_link(self):
+        return None
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, 0, 0
+        try:
+            position, last_rank, offset = self.load_cursor(encoded)
+            if len(position) != len(self.ordering):
+                raise ValueError
+            position = [
+                self.to_python(field.lstrip('-'), value)
+                for field, value in zip(self.ordering, position)
+            ]
+            last_rank, offset = int(last_rank), int(offset)
+        except (TypeError, ValueError, ValidationError, BadSignature) as e:
+            raise NotFound(self.invalid_cursor_message) from e
+        return position, last_rank, offset
@@ -1,10 +1,15 @@
-from datetime import datetime, timezone
+import logging
+
+from datetime import date, datetime, timezone
+from functools import lru_cache
 from io import BytesIO
 
 from dateutil.relativedelta import relativedelta  # type: ignore
 from django.core.files import File
 from PIL import Image
 
+logger = logging.getLogger(__name__)
+
 
 def get_image_file(name='test.png', ext='png', size=(5, 5), color=(256, 0, 0)):
     file_obj = BytesIO()
@@ -22,13 +27,47 @@ PERIODS = {
 
 
 def how_much_time_has_passed(dt: datetime) -> str:
+    """
+    Сколько прошло с dt до сегодняшнего дня (UTC) в виде
+    "1 год 2 месяца 3 дня". Считается по календарным дням, поэтому
+    результат запоминается для пары (сегодня, дата): после смены даты
+    старые записи вытесняются из кэша.
+    """
+    return how_much_time_has_passed_many([dt])[0]
+
+
+def how_much_time_has_passed_many(values: list[datetime]) -> list[str]:
+    """
+    Пакетный вариант how_much_time_has_passed: дата берется один раз,
+    одинаковые даты форматируются один раз.
+    """
+    today = datetime.now(timezone.utc).date()
+    result = []
+    for dt in values:
+        try:
+            since = to_utc_date(dt)
+        except (AttributeError, TypeError):
+            logger.warning('Ошибка преобразования даты: %r', dt)
+            result.append('')
+            continue
+        result.append(_format_time_passed(today, since))
+    return result
+
+
+def to_utc_date(dt: datetime) -> date:
+    if isinstance(dt, datetime):
+        if dt.tzinfo is not None:
+            dt = dt.astimezone(timezone.utc)
+        return dt.date()
+    if isinstance(dt, date):
+        return dt
+    raise TypeError(dt)
+
+
+@lru_cache(maxsize=65536)
+def _format_time_passed(today: date, since: date) -> str:
     result = ''
-    now = datetime.now(timezone.utc)
-    try:
-        delta = relativedelta(now, dt)
-    except TypeError:
-        print('Ошибка преобразования ')
-        return ''
+    delta = relativedelta(today, since)
     result += get_time_str(delta.years, PERIODS['years'])
     result += get_time_str(delta.months, PERIODS['month'])
     result += get_time_str(delta.days, PERIODS['days'])
@@ -0,0 +1,27 @@
+from django.contrib import admin
+
+from scheduler.models import JobLease, JobRun
+
+
+class JobRunAdmin(admin.ModelAdmin):
+    """
+    Настройки отображения модели JobRun
+    в админ панели.
+    """
+
+    list_display = (
+        'job',
+        'started_at',
+        'duration',
+        'rows_affected',
+        'outcome',
+    )
+    list_filter = ('job', 'outcome')
+
+
+class JobLeaseAdmin(admin.ModelAdmin):
+    list_display = ('name', 'owner', 'expires_at')
+
+
+admin.site.register(JobRun, JobRunAdmin)
+admin.site.register(JobLease, JobLeaseAdmin)
@@ -0,0 +1,73 @@
+from collections import namedtuple
+
+from django.conf import settings
+from django.utils import timezone
+
+from tasks.models import Task
+from users import ranking
+from users.achievements import (
+    NO_DELAY_ACHIEVEMENT,
+    get_no_delay_user_ids,
+    grant_achievements,
+)
+from users.models import Achievement, ExpiringToken
+from users.monthly_reset import get_previous_month, reset_month
+
+Job = namedtuple('Job', 'name func trigger')
+
+
+def reset_monthly_reward_points_and_achievements():
+    month = get_previous_month()
+    return reset_month(month.year, month.month)['users']
+
+
+def achievement_for_no_delay():
+    achievement = Achievement.objects.get(name=NO_DELAY_ACHIEVEMENT)
+    granted = grant_achievements(
+        get_no_delay_user_ids(timezone.localdate()), [achievement]
+    )
+    return sum(1 for new in granted.values() if new)
+
+
+def mark_overdue_tasks():
+    return Task.objects.mark_overdue()
+
+
+def clear_expired_tokens():
+    return ExpiringToken.objects.delete_expired()
+
+
+def refresh_user_ranks():
+    if not settings.USER_RANK_TABLE:
+        return None
+    return ranking.refresh_ranks()
+
+
+# Задача возвращает число затронутых строк или None, если не знает его.
+JOBS = (
+    Job(
+        'reset_monthly_reward_points',
+        reset_monthly_reward_points_and_achievements,
+        {'trigger': 'cron', 'day': '1'},
+    ),
+    Job(
+        'achievement_for_no_delay',
+        achievement_for_no_delay,
+        {'trigger': 'cron', 'day': 'last'},
+    ),
+    Job(
+        'mark_overdue_tasks',
+        mark_overdue_tasks,
+        {'trigger': 'interval', 'minutes': 5},
+    ),
+    Job(
+        'refresh_user_ranks',
+        refresh_user_ranks,
+        {'trigger': 'interval', 'minutes': 1},
+    ),
+    Job(
+        'clear_expired_tokens',
+        clear_expired_tokens,
+        {'trigger': 'cron', 'hour': 3},
+    ),
+)
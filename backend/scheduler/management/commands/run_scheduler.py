@@ -0,0 +1,42 @@
+from apscheduler.schedulers.blocking import BlockingScheduler
+from django.core.management.base import BaseCommand
+
+from scheduler.jobs import JOBS
+from scheduler.runner import Lease, renew_lease, run_job
+
+
+class Command(BaseCommand):
+    help = (
+        'Запуск планировщика задач. Можно запустить несколько экземпляров: '
+        'задачи выполняет только тот, кто держит аренду ведущего.'
+    )
+
+    def handle(self, *args, **kwargs):
+        lease = Lease()
+        scheduler = BlockingScheduler()
+        for job in JOBS:
+            scheduler.add_job(
+                run_job,
+                args=(job.name, job.func, lease),
+                id=job.name,
+                max_instances=1,
+                coalesce=True,
+                **job.trigger,
+            )
+        scheduler.add_job(
+            renew_lease,
+            'interval',
+            args=(lease,),
+            id='renew_lease',
+            seconds=lease.ttl.total_seconds() / 3,
+        )
+        renew_lease(lease)
+        self.stdout.write(
+            self.style.SUCCESS(f'Планировщик запущен: {lease.owner}.')
+        )
+        try:
+            scheduler.start()
+        except (KeyboardInterrupt, SystemExit):
+            pass
+        finally:
+            lease.release()
@@ -0,0 +1,47 @@
+# Generated by Django 3.2.25 on 2026-10-18 03:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobLease',
+            fields=[
+                ('name', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('owner', models.CharField(max_length=100, verbose_name='Владелец')),
+                ('expires_at', models.DateTimeField(verbose_name='Действует до')),
+            ],
+            options={
+                'verbose_name': 'Аренда планировщика',
+                'verbose_name_plural': 'Аренды планировщика',
+            },
+        ),
+        migrations.CreateModel(
+            name='JobRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job', models.CharField(max_length=100, verbose_name='Задача')),
+                ('started_at', models.DateTimeField(verbose_name='Начало')),
+                ('duration', models.FloatField(verbose_name='Длительность, с')),
+                ('rows_affected', models.PositiveIntegerField(blank=True, null=True, verbose_name='Затронуто строк')),
+                ('outcome', models.CharField(choices=[('success', 'Успешно'), ('failed', 'Ошибка')], max_length=10, verbose_name='Результат')),
+                ('error', models.TextField(blank=True, verbose_name='Ошибка')),
+            ],
+            options={
+                'verbose_name': 'Запуск задачи',
+                'verbose_name_plural': 'Запуски задач',
+                'ordering': ('-started_at',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='jobrun',
+            index=models.Index(fields=['job', '-started_at'], name='job_run_job_started_idx'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+from django.db import models
+
+
+class JobRun(models.Model):
+    """
+    Запуск задачи планировщика.
+    """
+
+    SUCCESS = 'success'
+    FAILED = 'failed'
+    OUTCOMES = (
+        (SUCCESS, 'Успешно'),
+        (FAILED, 'Ошибка'),
+    )
+
+    job = models.CharField(verbose_name='Задача', max_length=100)
+    started_at = models.DateTimeField(verbose_name='Начало')
+    duration = models.FloatField(verbose_name='Длительность, с')
+    rows_affected = models.PositiveIntegerField(
+        verbose_name='Затронуто строк', null=True, blank=True
+    )
+    outcome = models.CharField(
+        verbose_name='Результат', max_length=10, choices=OUTCOMES
+    )
+    error = models.TextField(verbose_name='Ошибка', blank=True)
+
+    class Meta:
+        verbose_name = 'Запуск задачи'
+        verbose_name_plural = 'Запуски задач'
+        ordering = ('-started_at',)
+        indexes = [
+            models.Index(
+                fields=['job', '-started_at'], name='job_run_job_started_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.job} {self.started_at:%Y-%m-%d %H:%M}'
+
+
+class JobLease(models.Model):
+    """
+    Аренда роли ведущего планировщика. Задачи запускает только
+    процесс, который держит действующую аренду.
+    """
+
+    name = models.CharField(max_length=100, primary_key=True)
+    owner = models.CharField(verbose_name='Владелец', max_length=100)
+    expires_at = models.DateTimeField(verbose_name='Действует до')
+
+    class Meta:
+        verbose_name = 'Аренда планировщика'
+        verbose_name_plural = 'Аренды планировщика'
+
+    def __str__(self):
+        return f'{self.name}: {self.owner}'
@@ -0,0 +1,96 @@
+import logging
+import os
+import socket
+import traceback
+
+from datetime import timedelta
+from time import monotonic
+from uuid import uuid4
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from scheduler.models import JobLease, JobRun
+
+logger = logging.getLogger(__name__)
+
+LEADER_LEASE = 'scheduler'
+
+
+class Lease:
+    """
+    Аренда строки JobLease. Захватить ее можно, если она свободна,
+    истекла или уже принадлежит этому процессу; захват продлевает ее.
+    """
+
+    def __init__(self, name=LEADER_LEASE, owner=None, ttl=None):
+        self.name = name
+        self.owner = owner or (
+            f'{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}'
+        )
+        self.ttl = timedelta(seconds=ttl or settings.SCHEDULER_LEASE_TTL)
+
+    def acquire(self):
+        now = timezone.now()
+        updated = JobLease.objects.filter(
+            Q(owner=self.owner) | Q(expires_at__lt=now), name=self.name
+        ).update(owner=self.owner, expires_at=now + self.ttl)
+        if updated:
+            return True
+        try:
+            with transaction.atomic():
+                JobLease.objects.create(
+                    name=self.name,
+                    owner=self.owner,
+                    expires_at=now + self.ttl,
+                )
+        except IntegrityError:
+            return False
+        return True
+
+    def release(self):
+        JobLease.objects.filter(name=self.name, owner=self.owner).delete()
+
+
+def renew_lease(lease):
+    close_old_connections()
+    try:
+        lease.acquire()
+    finally:
+        close_old_connections()
+
+
+def run_job(name, func, lease):
+    """
+    Запускает задачу, если этот процесс ведущий, и записывает запуск в
+    JobRun. Ошибка задачи записывается и не останавливает планировщик.
+    Возвращает JobRun или None, если задачу запускает другой процесс.
+    """
+    close_old_connections()
+    try:
+        if not lease.acquire():
+            logger.info('%s: ведущий планировщик в другом процессе.', name)
+            return None
+        started_at = timezone.now()
+        started = monotonic()
+        rows_affected = None
+        outcome = JobRun.SUCCESS
+        error = ''
+        try:
+            rows_affected = func()
+        except Exception:
+            logger.exception('%s: ошибка выполнения задачи.', name)
+            outcome = JobRun.FAILED
+            error = traceback.format_exc()
+        return JobRun.objects.create(
+            job=name,
+            started_at=started_at,
+            duration=monotonic() - started,
+            rows_affected=rows_affected,
+            outcome=outcome,
+            error=error,
+        )
+    finally:
+        close_old_connections()
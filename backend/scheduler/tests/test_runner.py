@@ -0,0 +1,54 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from scheduler.models import JobLease, JobRun
+from scheduler.runner import Lease, run_job
+
+
+class RunJobTest(TestCase):
+    """
+    Тестирование запуска задач планировщика под арендой ведущего.
+    """
+
+    def setUp(self):
+        self.leader = Lease(owner='leader', ttl=60)
+        self.follower = Lease(owner='follower', ttl=60)
+
+    def test_run_recorded(self):
+        run = run_job('job', lambda: 5, self.leader)
+        self.assertEqual(run.outcome, JobRun.SUCCESS)
+        self.assertEqual(run.rows_affected, 5)
+        self.assertGreaterEqual(run.duration, 0)
+        self.assertEqual(JobRun.objects.count(), 1)
+
+    def test_failure_recorded(self):
+        def fail():
+            raise ValueError('boom')
+
+        with self.assertLogs('scheduler.runner', 'ERROR'):
+            run = run_job('job', fail, self.leader)
+        self.assertEqual(run.outcome, JobRun.FAILED)
+        self.assertIn('ValueError: boom', run.error)
+
+    def test_only_leader_runs(self):
+        calls = []
+        run_job('job', lambda: calls.append('leader'), self.leader)
+        self.assertIsNone(
+            run_job('job', lambda: calls.append('follower'), self.follower)
+        )
+        run_job('job', lambda: calls.append('leader'), self.leader)
+        self.assertEqual(calls, ['leader', 'leader'])
+        self.assertEqual(JobRun.objects.count(), 2)
+
+    def test_expired_lease_taken_over(self):
+        self.assertTrue(self.leader.acquire())
+        JobLease.objects.update(expires_at=timezone.now() - timedelta(1))
+        self.assertTrue(self.follower.acquire())
+        self.assertFalse(self.leader.acquire())
+
+    def test_released_lease_taken_over(self):
+        self.assertTrue(self.leader.acquire())
+        self.leader.release()
+        self.assertTrue(self.follower.acquire())
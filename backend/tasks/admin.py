@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.db.models import Q
 from import_export import resources
 from import_export.admin import ImportExportModelAdmin
 
@@ -12,6 +13,7 @@ class TaskResource(resources.ModelResource):
 
     class Meta:
         model = Task
+        exclude = ('search_vector',)
         skip_unchanged = True
         report_skipped = True
 
@@ -27,5 +29,21 @@ class TaskAdmin(ImportExportModelAdmin):
     search_fields = ['id', 'title', 'description']
     resource_classes = [TaskResource]
 
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Поиск по тому же полнотекстовому индексу, что и в API.
+        Число в строке поиска также ищется среди id задач.
+        """
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        found = queryset.search(search_term).values('id')
+        if search_term.isdigit():
+            return (
+                queryset.filter(Q(id=search_term) | Q(id__in=found)),
+                False,
+            )
+        return queryset.filter(id__in=found), False
+
 
 admin.site.register(Task, TaskAdmin)
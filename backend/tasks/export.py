@@ -0,0 +1,102 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils.text import compress_sequence
+from rest_framework.negotiation import BaseContentNegotiation
+
+EXPORT_FIELDS = (
+    'id',
+    'title',
+    'description',
+    'status',
+    'reward_points',
+    'is_overdue',
+    'created_at',
+    'deadline',
+    'department__name',
+    'team_leader__email',
+    'assigned_to__email',
+)
+CHUNK_SIZE = 2000
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+}
+
+
+class ExportContentNegotiation(BaseContentNegotiation):
+    """
+    Выгрузка отдается потоком в обход рендереров DRF, поэтому заголовок
+    Accept клиента не проверяется, а ошибки возвращаются в JSON.
+    """
+
+    def select_parser(self, request, parsers):
+        return parsers[0]
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+
+class Echo:
+    """Буфер для csv.writer, который сразу возвращает записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def iter_ndjson(rows):
+    for row in rows:
+        yield json.dumps(
+            dict(zip(EXPORT_FIELDS, row)),
+            ensure_ascii=False,
+            cls=DjangoJSONEncoder,
+        ) + '\n'
+
+
+def iter_chunks(lines, size=CHUNK_SIZE):
+    """Склеивает строки выгрузки в блоки, чтобы не отдавать по строке."""
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= size:
+            yield ''.join(chunk).encode()
+            chunk = []
+    if chunk:
+        yield ''.join(chunk).encode()
+
+
+def stream_tasks(queryset, export_format, gzip=False):
+    """
+    Потоковая выгрузка задач в CSV или NDJSON.
+    Строки читаются из базы через iterator() порциями, поэтому память
+    не зависит от размера выгрузки.
+    """
+    rows = (
+        queryset.order_by('id')
+        .values_list(*EXPORT_FIELDS)
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    writer = iter_csv if export_format == 'csv' else iter_ndjson
+    content = iter_chunks(writer(rows))
+    if gzip:
+        content = compress_sequence(content)
+    response = StreamingHttpResponse(
+        content, content_type=CONTENT_TYPES[export_format]
+    )
+    response[
+        'Content-Disposition'
+    ] = f'attachment; filename="tasks.{export_format}"'
+    response['Vary'] = 'Accept-Encoding'
+    response['X-Accel-Buffering'] = 'no'
+    if gzip:
+        response['Content-Encoding'] = 'gzip'
+    return response
@@ -0,0 +1,156 @@
+import random
+
+from datetime import timedelta
+from statistics import median
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from department.models import Department
+from tasks.models import Task
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Замер запросов к задачам без составных индексов и с ними. '
+        'Тестовые данные создаются внутри транзакции и откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=1_000_000)
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        with transaction.atomic():
+            users, departments = self.seed(options)
+            queries = self.get_queries(users, departments)
+
+            self.drop_indexes()
+            self.analyze()
+            self.report('Без индексов', queries, options['repeat'])
+
+            self.create_indexes()
+            self.analyze()
+            self.report('С индексами', queries, options['repeat'])
+
+            transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS('Тестовые данные удалены.'))
+
+    def seed(self, options):
+        departments = []
+        for name, _label in Department.DEPARTMENT_NAMES:
+            department = Department.objects.filter(name=name).first()
+            if department is None:
+                department = Department.objects.create(name=name)
+            departments.append(department)
+
+        User.objects.bulk_create(
+            User(
+                email=f'benchmark{number}@benchmark.local',
+                first_name='Benchmark',
+                last_name=str(number),
+                password='!',
+                department=random.choice(departments),
+                is_active=True,
+            )
+            for number in range(options['users'])
+        )
+        users = list(User.objects.filter(email__endswith='@benchmark.local'))
+
+        now = timezone.now()
+        statuses = [status for status, _label in Task.TASK_STATUSES]
+        created = 0
+        started = perf_counter()
+        while created < options['tasks']:
+            size = min(options['batch_size'], options['tasks'] - created)
+            batch = []
+            for _ in range(size):
+                assignee = random.choice(users)
+                batch.append(
+                    Task(
+                        title='benchmark',
+                        description='benchmark',
+                        deadline=now
+                        + timedelta(days=random.randint(-730, 60)),
+                        reward_points=random.randint(1, 100),
+                        team_leader=random.choice(users),
+                        assigned_to=assignee,
+                        department_id=assignee.department_id,
+                        status=random.choice(statuses),
+                        is_overdue=random.random() < 0.1,
+                    )
+                )
+            Task.objects.bulk_create(batch)
+            created += size
+        self.stdout.write(
+            f'Создано задач: {created} за {perf_counter() - started:.1f} с.'
+        )
+        return users, departments
+
+    def get_queries(self, users, departments):
+        user = random.choice(users)
+        department = random.choice(departments)
+        start_of_month = timezone.now().replace(
+            day=1, hour=0, minute=0, second=0, microsecond=0
+        )
+        next_month = (start_of_month + timedelta(days=32)).replace(day=1)
+        month = Q(deadline__gte=start_of_month, deadline__lt=next_month)
+        return {
+            'Список задач (исполнитель или тимлид + статус)': (
+                Task.objects.filter(
+                    Q(assigned_to=user) | Q(team_leader=user),
+                    status=Task.CREATED,
+                )
+            ),
+            'Прогресс пользователя за месяц': Task.objects.filter(
+                month, assigned_to=user, status=Task.APPROVED
+            ).order_by(),
+            'Прогресс департамента за месяц': Task.objects.filter(
+                month, department=department, status=Task.APPROVED
+            ).order_by(),
+            'Поиск просроченных задач': Task.objects.filter(
+                deadline__lt=timezone.now(),
+                status__in=[Task.CREATED, Task.RETURNED],
+                is_overdue=False,
+            ).order_by(),
+        }
+
+    def report(self, title, queries, repeat):
+        self.stdout.write(self.style.MIGRATE_HEADING(title))
+        for name, queryset in queries.items():
+            timings = []
+            for _ in range(repeat):
+                started = perf_counter()
+                list(queryset.values_list('id', flat=True))
+                timings.append((perf_counter() - started) * 1000)
+            self.stdout.write(self.style.MIGRATE_LABEL(name))
+            self.stdout.write(queryset.explain())
+            self.stdout.write(
+                f'Медиана: {median(timings):.2f} мс, '
+                f'минимум: {min(timings):.2f} мс\n'
+            )
+
+    def drop_indexes(self):
+        self.execute_index_sql('remove_sql')
+
+    def create_indexes(self):
+        self.execute_index_sql('create_sql')
+
+    def execute_index_sql(self, method):
+        schema_editor = connection.schema_editor()
+        with connection.cursor() as cursor:
+            for index in Task._meta.indexes:
+                sql = getattr(index, method)(Task, schema_editor)
+                cursor.execute(str(sql))
+
+    def analyze(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {Task._meta.db_table}')
@@ -0,0 +1,21 @@
+from time import monotonic
+
+from django.core.management.base import BaseCommand
+
+from tasks.models import Task
+
+
+class Command(BaseCommand):
+    help = 'Пометка просроченных задач.'
+
+    def handle(self, *args, **kwargs):
+        started = monotonic()
+        updated = Task.objects.mark_overdue()
+        duration = monotonic() - started
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Помечено просроченных задач: {updated} '
+                f'за {duration:.3f} с.'
+            )
+        )
@@ -0,0 +1,20 @@
+from time import monotonic
+
+from django.core.management.base import BaseCommand
+
+from tasks import stats
+
+
+class Command(BaseCommand):
+    help = 'Пересчет помесячной статистики задач по таблице задач.'
+
+    def handle(self, *args, **kwargs):
+        started = monotonic()
+        rows = stats.rebuild()
+        duration = monotonic() - started
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Статистика пересчитана: {rows} строк за {duration:.3f} с.'
+            )
+        )
@@ -0,0 +1,29 @@
+# Generated by Django 3.2.25 on 2026-10-18 02:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0008_alter_task_options'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['assigned_to', 'status', 'deadline'], name='task_assignee_status_dl_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['team_leader', 'status', 'created_at'], name='task_leader_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['department', 'status', 'deadline'], name='task_dep_status_dl_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('status__in', ['created', 'returned_for_revision', 'sent_for_review'])), fields=['deadline'], name='task_open_deadline_idx'),
+        ),
+    ]
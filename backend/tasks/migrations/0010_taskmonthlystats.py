@@ -0,0 +1,101 @@
+# Generated by Django 3.2.25 on 2026-10-18 02:34
+
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+import django.db.models.deletion
+
+
+def get_row_key(row):
+    return row['assigned_to'], row['department'], row['year'], row['month']
+
+
+def fill_task_stats(apps, schema_editor):
+    """
+    Копия tasks.stats.rebuild на исторических моделях: миграция не
+    должна зависеть от текущего кода приложения.
+    """
+    Task = apps.get_model('tasks', 'Task')
+    TaskMonthlyStats = apps.get_model('tasks', 'TaskMonthlyStats')
+    totals = defaultdict(Counter)
+    tasks = Task.objects.order_by()
+    created = (
+        tasks.annotate(
+            year=ExtractYear('created_at'), month=ExtractMonth('created_at')
+        )
+        .values('assigned_to', 'department', 'year', 'month')
+        .annotate(created=Count('id'))
+    )
+    for row in created:
+        totals[get_row_key(row)]['created'] += row['created']
+    by_deadline = (
+        tasks.annotate(
+            year=ExtractYear('deadline'), month=ExtractMonth('deadline')
+        )
+        .values('assigned_to', 'department', 'year', 'month')
+        .annotate(
+            approved=Count('id', filter=Q(status='approved')),
+            overdue=Count('id', filter=Q(is_overdue=True)),
+            points=Sum('reward_points', filter=Q(status='approved')),
+        )
+    )
+    for row in by_deadline:
+        key = get_row_key(row)
+        totals[key]['approved'] += row['approved']
+        totals[key]['overdue'] += row['overdue']
+        totals[key]['points'] += row['points'] or 0
+    TaskMonthlyStats.objects.bulk_create(
+        (
+            TaskMonthlyStats(
+                user_id=user_id,
+                department_id=department_id,
+                year=year,
+                month=month,
+                **values,
+            )
+            for (user_id, department_id, year, month), values in totals.items()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('department', '0003_alter_department_description'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tasks', '0009_task_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskMonthlyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('month', models.PositiveSmallIntegerField()),
+                ('created', models.IntegerField(default=0)),
+                ('approved', models.IntegerField(default=0)),
+                ('overdue', models.IntegerField(default=0)),
+                ('points', models.IntegerField(default=0)),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='task_stats', to='department.department')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Статистика задач за месяц',
+                'verbose_name_plural': 'Статистика задач за месяц',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='taskmonthlystats',
+            index=models.Index(fields=['year', 'month', 'department'], name='task_stats_month_dep_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='taskmonthlystats',
+            constraint=models.UniqueConstraint(fields=('user', 'department', 'year', 'month'), name='unique task stats for user and month'),
+        ),
+        migrations.RunPython(fill_task_stats, migrations.RunPython.noop),
+    ]
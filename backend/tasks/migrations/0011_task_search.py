@@ -0,0 +1,108 @@
+# Generated by Django 3.2.25 on 2026-10-18 02:35
+
+import django.contrib.postgres.search
+
+from django.db import migrations
+
+POSTGRESQL_FORWARDS = [
+    """
+    CREATE FUNCTION tasks_task_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('russian', coalesce(NEW.title, '')), 'A')
+            || setweight(
+                to_tsvector('russian', coalesce(NEW.description, '')), 'B'
+            );
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER tasks_task_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description ON tasks_task
+    FOR EACH ROW EXECUTE PROCEDURE tasks_task_search_vector_update()
+    """,
+    'UPDATE tasks_task SET title = title',
+    """
+    CREATE INDEX task_search_vector_idx ON tasks_task
+    USING gin (search_vector)
+    """,
+]
+POSTGRESQL_BACKWARDS = [
+    'DROP INDEX IF EXISTS task_search_vector_idx',
+    'DROP TRIGGER IF EXISTS tasks_task_search_vector_trigger ON tasks_task',
+    'DROP FUNCTION IF EXISTS tasks_task_search_vector_update()',
+]
+
+SQLITE_FORWARDS = [
+    """
+    CREATE VIRTUAL TABLE tasks_task_fts USING fts5(
+        title, description, content='tasks_task', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER tasks_task_fts_insert AFTER INSERT ON tasks_task BEGIN
+        INSERT INTO tasks_task_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER tasks_task_fts_delete AFTER DELETE ON tasks_task BEGIN
+        INSERT INTO tasks_task_fts(tasks_task_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER tasks_task_fts_update
+    AFTER UPDATE OF title, description ON tasks_task BEGIN
+        INSERT INTO tasks_task_fts(tasks_task_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO tasks_task_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    "INSERT INTO tasks_task_fts(tasks_task_fts) VALUES ('rebuild')",
+]
+SQLITE_BACKWARDS = [
+    'DROP TRIGGER IF EXISTS tasks_task_fts_update',
+    'DROP TRIGGER IF EXISTS tasks_task_fts_delete',
+    'DROP TRIGGER IF EXISTS tasks_task_fts_insert',
+    'DROP TABLE IF EXISTS tasks_task_fts',
+]
+
+
+def run_vendor_sql(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0010_taskmonthlystats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(
+            run_vendor_sql(
+                {
+                    'postgresql': POSTGRESQL_FORWARDS,
+                    'sqlite': SQLITE_FORWARDS,
+                }
+            ),
+            run_vendor_sql(
+                {
+                    'postgresql': POSTGRESQL_BACKWARDS,
+                    'sqlite': SQLITE_BACKWARDS,
+                }
+            ),
+        ),
+    ]
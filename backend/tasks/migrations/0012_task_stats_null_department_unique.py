@@ -0,0 +1,47 @@
+# Generated by Django 3.2.25 on 2026-10-18 03:18
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def merge_duplicates(apps, schema_editor):
+    """
+    Складывает повторяющиеся строки статистики без подразделения,
+    которые пропускало прежнее ограничение.
+    """
+    TaskMonthlyStats = apps.get_model('tasks', 'TaskMonthlyStats')
+    rows = TaskMonthlyStats.objects.filter(department__isnull=True)
+    duplicates = (
+        rows.order_by()
+        .values('user', 'year', 'month')
+        .annotate(rows=Count('id'))
+        .filter(rows__gt=1)
+    )
+    for key in duplicates:
+        first, *others = rows.filter(
+            user=key['user'], year=key['year'], month=key['month']
+        ).order_by('id')
+        for row in others:
+            first.created += row.created
+            first.approved += row.approved
+            first.overdue += row.overdue
+            first.points += row.points
+        first.save()
+        TaskMonthlyStats.objects.filter(
+            id__in=[row.id for row in others]
+        ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0011_task_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='taskmonthlystats',
+            constraint=models.UniqueConstraint(condition=models.Q(('department__isnull', True)), fields=('user', 'year', 'month'), name='unique task stats for user and month without dep'),
+        ),
+    ]
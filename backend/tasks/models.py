@@ -1,10 +1,98 @@
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVectorField,
+)
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import connections, models, transaction
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from department.models import Department
 from users.models import User
 
+SEARCH_CONFIG = 'russian'
+
+
+class TaskQuerySet(models.QuerySet):
+    def search(self, query):
+        """
+        Полнотекстовый поиск по названию и описанию задачи.
+        Добавляет аннотацию search_rank: чем больше, тем релевантнее.
+        В PostgreSQL используется столбец search_vector с GIN-индексом,
+        в SQLite - таблица FTS5 tasks_task_fts.
+        """
+        vendor = connections[self.db].vendor
+        if vendor == 'postgresql':
+            search_query = SearchQuery(
+                query, config=SEARCH_CONFIG, search_type='websearch'
+            )
+            return self.annotate(
+                search_rank=SearchRank(models.F('search_vector'), search_query)
+            ).filter(search_vector=search_query)
+        if vendor == 'sqlite':
+            match = ' '.join(
+                '"{}"'.format(word.replace('"', '""'))
+                for word in query.split()
+            )
+            return self.annotate(
+                search_rank=RawSQL(
+                    'SELECT -bm25(tasks_task_fts) FROM tasks_task_fts '
+                    'WHERE tasks_task_fts MATCH %s '
+                    'AND tasks_task_fts.rowid = tasks_task.id',
+                    [match],
+                    output_field=models.FloatField(),
+                )
+            ).filter(
+                id__in=RawSQL(
+                    'SELECT rowid FROM tasks_task_fts '
+                    'WHERE tasks_task_fts MATCH %s',
+                    [match],
+                )
+            )
+        return self.annotate(
+            search_rank=models.Value(0.0, output_field=models.FloatField())
+        ).filter(
+            models.Q(title__icontains=query)
+            | models.Q(description__icontains=query)
+        )
+
+    def mark_overdue(self):
+        """
+        Помечает просроченными незавершенные задачи с истекшим дедлайном.
+        Еще не помеченные строки блокируются для учета в статистике и
+        обновляются одним UPDATE по первичным ключам, без повторной
+        проверки условий.
+        Возвращает количество измененных задач.
+        """
+        from tasks import stats
+
+        stale = self.filter(
+            deadline__lt=timezone.now(),
+            status__in=[Task.CREATED, Task.RETURNED],
+            is_overdue=False,
+        )
+        with transaction.atomic():
+            rows = list(
+                stale.select_for_update()
+                .order_by()
+                .values_list(
+                    'id', 'assigned_to_id', 'department_id', 'deadline'
+                )
+            )
+            if not rows:
+                return 0
+            updated = Task.objects.filter(
+                pk__in=[row[0] for row in rows]
+            ).update(is_overdue=True)
+            totals = {}
+            for _task_id, user_id, department_id, deadline in rows:
+                key = (user_id, department_id, *stats.get_month(deadline))
+                totals.setdefault(key, {'overdue': 0})['overdue'] += 1
+            stats.apply_totals(totals)
+        return updated
+
 
 class Task(models.Model):
     """
@@ -51,11 +139,90 @@ class Task(models.Model):
         blank=True,
     )
     is_overdue = models.BooleanField(default=False)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = TaskQuerySet.as_manager()
 
     class Meta:
         ordering = ['-created_at']
         verbose_name = 'Задачу'
         verbose_name_plural = 'Задачи'
+        indexes = [
+            models.Index(
+                fields=['assigned_to', 'status', 'deadline'],
+                name='task_assignee_status_dl_idx',
+            ),
+            models.Index(
+                fields=['team_leader', 'status', 'created_at'],
+                name='task_leader_status_created_idx',
+            ),
+            models.Index(
+                fields=['department', 'status', 'deadline'],
+                name='task_dep_status_dl_idx',
+            ),
+            models.Index(
+                fields=['deadline'],
+                name='task_open_deadline_idx',
+                condition=models.Q(
+                    status__in=[
+                        'created',
+                        'returned_for_revision',
+                        'sent_for_review',
+                    ]
+                ),
+            ),
+        ]
 
     def __str__(self):
         return self.title
+
+
+class TaskMonthlyStats(models.Model):
+    """
+    Помесячная статистика задач пользователя в подразделении.
+    Задача учитывается в created по месяцу создания, а в approved,
+    overdue и points - по месяцу дедлайна.
+    """
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='task_stats'
+    )
+    department = models.ForeignKey(
+        Department,
+        on_delete=models.CASCADE,
+        related_name='task_stats',
+        null=True,
+        blank=True,
+    )
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    created = models.IntegerField(default=0)
+    approved = models.IntegerField(default=0)
+    overdue = models.IntegerField(default=0)
+    points = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Статистика задач за месяц'
+        verbose_name_plural = 'Статистика задач за месяц'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('user', 'department', 'year', 'month'),
+                name='unique task stats for user and month',
+            ),
+            # NULL в department не совпадает с другим NULL в первом
+            # ограничении, строки без подразделения проверяются отдельно.
+            models.UniqueConstraint(
+                fields=('user', 'year', 'month'),
+                condition=models.Q(department__isnull=True),
+                name='unique task stats for user and month without dep',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['year', 'month', 'department'],
+                name='task_stats_month_dep_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.user} {self.month:02}.{self.year}'
@@ -1,5 +1,8 @@
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema
 
+from tasks.serializers import TaskExportSerializer
+
 
 class SCHEMA:
     task = {
@@ -8,6 +11,9 @@ class SCHEMA:
             description=(
                 'Получение списка задач текущего пользователя или тимлида.'
                 '\n\nУпорядочено по дате создания (сначала новые).'
+                '\n\nПостраничный вывод по курсору: ссылки на соседние '
+                'страницы в полях next и previous, размер страницы задается '
+                'параметром page_size.'
                 '\n\nФильтрация задач по статусу и просроченным дедлайнам.'
                 '\n\nПример запроса с фильтрацией - Новые задачи:'
                 'http://example.com/api/tasks/?status=createdx'
@@ -15,6 +21,9 @@ class SCHEMA:
                 'http://example.com/api/tasks/?status=sent_for_review'
                 '\n\nПример запроса с фильтрацией - Просроченные:'
                 'http://example.com/api/tasks/?is_overdue=true'
+                '\n\nПолнотекстовый поиск по названию и описанию: параметр '
+                'search, результаты упорядочены по релевантности:'
+                'http://example.com/api/tasks/?search=отчет'
             ),
         ),
         'retrieve': extend_schema(summary='Получение задачи по id.'),
@@ -27,9 +36,6 @@ class SCHEMA:
             summary='Обновление задачи по id.',
             description='Изменяет только переданные поля.',
         ),
-        'update_overdue_tasks': extend_schema(
-            summary='Обновление статуса просроченных задач.'
-        ),
         'create': extend_schema(
             summary='Создание новой задачи тимлидером.',
             description=(
@@ -39,6 +45,15 @@ class SCHEMA:
                 'департаменте.'
             ),
         ),
+        'bulk': extend_schema(
+            summary='Массовое создание задач тимлидером.',
+            description=(
+                'Принимает список задач (не более 100) и создает их в одной '
+                'транзакции: либо все, либо ни одной.'
+                '\n\n400: список ошибок по каждой задаче в порядке '
+                'передачи, для корректных задач - пустой объект.'
+            ),
+        ),
         'send_for_review': extend_schema(
             summary=(
                 'Отправка задачи текущего пользователя на проверку '
@@ -46,7 +61,31 @@ class SCHEMA:
             )
         ),
         'review_task': extend_schema(
-            summary='Проверка задачи тимлидом и изменение её статуса.'
+            summary='Проверка задачи тимлидом и изменение её статуса.',
+            description=(
+                'Проверить можно только задачу со статусом '
+                '"sent_for_review", иначе 400.'
+            ),
+        ),
+        'review_batch': extend_schema(
+            summary='Проверка нескольких задач тимлидом одним запросом.',
+            description=(
+                'Принимает список объектов {task, review_status} (не более '
+                '500). Проверяются только задачи со статусом '
+                '"sent_for_review". В ответе для каждой задачи новый статус '
+                'или ошибка.'
+            ),
+        ),
+        'export': extend_schema(
+            summary='Потоковая выгрузка задач в CSV или NDJSON.',
+            description=(
+                'Фильтры: department, status, date_from и date_to (по '
+                'дедлайну, включительно). Формат задается параметром '
+                'export_format=csv|ndjson. Если клиент передает '
+                '"Accept-Encoding: gzip", ответ сжимается.'
+            ),
+            parameters=[TaskExportSerializer],
+            responses={(200, 'text/csv'): OpenApiTypes.STR},
         ),
     }
 
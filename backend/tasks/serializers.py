@@ -1,8 +1,11 @@
+from collections import Counter
 from datetime import datetime
 
 from rest_framework import serializers
 
 from department.models import Department
+from notifications.models import Notification
+from tasks import stats
 from tasks.models import Task
 from users.models import User
 
@@ -34,7 +37,7 @@ class TaskSerializer(serializers.ModelSerializer):
     class Meta:
         model = Task
         read_only_fields = ('is_overdue',)
-        fields = '__all__'
+        exclude = ('search_vector',)
 
 
 class TaskCreateSerializer(TaskSerializer):
@@ -57,7 +60,137 @@ class TaskCreateSerializer(TaskSerializer):
         return obj
 
 
+class TaskBulkCreateListSerializer(serializers.ListSerializer):
+    """
+    Список задач для массового создания.
+    Исполнители всех задач загружаются одним запросом до проверки
+    отдельных задач, создание выполняется через bulk_create.
+    """
+
+    def to_internal_value(self, data):
+        self.assignees = self.get_assignees(data)
+        return super().to_internal_value(data)
+
+    def get_assignees(self, data):
+        ids = set()
+        if isinstance(data, list):
+            for item in data:
+                try:
+                    ids.add(int(item.get('assigned_to')))
+                except (AttributeError, TypeError, ValueError):
+                    continue
+        return {
+            user_id: (department_id, department_name)
+            for user_id, department_id, department_name in (
+                User.objects.filter(id__in=ids).values_list(
+                    'id', 'department_id', 'department__name'
+                )
+            )
+        }
+
+    def create(self, validated_data):
+        tasks = [
+            Task(
+                title=item['title'],
+                description=item['description'],
+                deadline=item['deadline'],
+                reward_points=item['reward_points'],
+                status=item['status'],
+                team_leader=item['team_leader'],
+                assigned_to_id=item['assigned_to'],
+                department_id=self.assignees[item['assigned_to']][0],
+            )
+            for item in validated_data
+        ]
+        Task.objects.bulk_create(tasks)
+        stats.apply_changes((None, stats.get_state(task)) for task in tasks)
+        Notification.objects.bulk_create(
+            Notification(
+                user_id=task.assigned_to_id,
+                message=(
+                    f'Вы были назначены исполнителем задачи "{task.title}"'
+                ),
+            )
+            for task in tasks
+        )
+        return tasks
+
+
+class TaskBulkCreateSerializer(TaskSerializer):
+    """[POST] Массовое создание задач."""
+
+    assigned_to = serializers.IntegerField()
+
+    class Meta(TaskSerializer.Meta):
+        list_serializer_class = TaskBulkCreateListSerializer
+
+    def validate_deadline(self, deadline):
+        if deadline < datetime.now(deadline.tzinfo):
+            raise serializers.ValidationError(
+                'Дедлайн не может быть в прощедшей дате.'
+            )
+        return deadline
+
+    def validate(self, obj):
+        assignee = self.parent.assignees.get(obj['assigned_to'])
+        if assignee is None:
+            raise serializers.ValidationError(
+                {'assigned_to': 'Пользователь не найден.'}
+            )
+        if assignee[1] != obj['department']:
+            raise serializers.ValidationError(
+                {'department': 'Такого пользователя нет в этом департаменте.'}
+            )
+        return obj
+
+
 class TaskReviewSerializer(serializers.Serializer):
     review_status = serializers.ChoiceField(
         required=True, choices=[Task.APPROVED, Task.RETURNED]
     )
+
+
+class TaskBatchReviewListSerializer(serializers.ListSerializer):
+    """Решения пакетной проверки, по одному на задачу."""
+
+    def validate(self, attrs):
+        counts = Counter(item['task'] for item in attrs)
+        duplicates = sorted(
+            task for task, count in counts.items() if count > 1
+        )
+        if duplicates:
+            raise serializers.ValidationError(
+                'Задачи указаны несколько раз: '
+                f'{", ".join(map(str, duplicates))}.'
+            )
+        return attrs
+
+
+class TaskBatchReviewSerializer(TaskReviewSerializer):
+    task = serializers.IntegerField()
+
+    class Meta:
+        list_serializer_class = TaskBatchReviewListSerializer
+
+
+class TaskExportSerializer(serializers.Serializer):
+    export_format = serializers.ChoiceField(
+        choices=['csv', 'ndjson'], default='csv'
+    )
+    department = serializers.ChoiceField(
+        choices=Department.DEPARTMENT_NAMES, required=False
+    )
+    status = serializers.ChoiceField(
+        choices=Task.TASK_STATUSES, required=False
+    )
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+    def validate(self, data):
+        date_from = data.get('date_from')
+        date_to = data.get('date_to')
+        if date_from and date_to and date_from > date_to:
+            raise serializers.ValidationError(
+                {'date_to': 'Конец периода раньше его начала.'}
+            )
+        return data
@@ -0,0 +1,50 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from tasks import stats
+from tasks.models import Task
+
+
+def affects_stats(update_fields):
+    """Может ли save(update_fields=...) изменить статистику."""
+    if update_fields is None:
+        return True
+    return any(
+        Task._meta.get_field(name).attname in stats.STATE_FIELDS
+        for name in update_fields
+    )
+
+
+@receiver(pre_save, sender=Task)
+def remember_task_state(sender, instance, raw, update_fields, **kwargs):
+    """
+    Запоминает сохраненное в базе состояние задачи перед изменением.
+    Сохранение полей, от которых статистика не зависит, лишнего
+    запроса не делает.
+    """
+    instance._stats_state = None
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    if not affects_stats(update_fields):
+        return
+    values = (
+        Task.objects.filter(pk=instance.pk)
+        .values_list(*stats.STATE_FIELDS)
+        .first()
+    )
+    if values is not None:
+        instance._stats_state = stats.TaskState(*values)
+
+
+@receiver(post_save, sender=Task)
+def update_task_stats(sender, instance, raw, update_fields, **kwargs):
+    if raw or not affects_stats(update_fields):
+        return
+    stats.apply_changes(
+        [(getattr(instance, '_stats_state', None), stats.get_state(instance))]
+    )
+
+
+@receiver(post_delete, sender=Task)
+def remove_task_stats(sender, instance, **kwargs):
+    stats.apply_changes([(stats.get_state(instance), None)])
@@ -0,0 +1,236 @@
+from collections import Counter, defaultdict, namedtuple
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+from django.utils import timezone
+
+from tasks.models import Task, TaskMonthlyStats
+
+TaskState = namedtuple(
+    'TaskState',
+    [
+        'assigned_to_id',
+        'department_id',
+        'created_at',
+        'deadline',
+        'status',
+        'is_overdue',
+        'reward_points',
+    ],
+)
+STATE_FIELDS = TaskState._fields
+ApprovedCounts = namedtuple('ApprovedCounts', 'total user department')
+
+PROGRESS_VERSION_KEY = 'task_progress_version:{}:{}'
+PROGRESS_KEY = 'task_progress:{}:{}:{}:{}:{}'
+
+
+def get_state(task, **changes):
+    """
+    Поля задачи, от которых зависит статистика.
+    changes подменяет значения, например новый статус после UPDATE.
+    """
+    state = TaskState(*(getattr(task, field) for field in STATE_FIELDS))
+    return state._replace(**changes)
+
+
+def get_month(dt):
+    if timezone.is_naive(dt):
+        dt = timezone.make_aware(dt)
+    dt = timezone.localtime(dt)
+    return dt.year, dt.month
+
+
+def get_contribution(state):
+    """
+    Вклад одной задачи в строки статистики:
+    {(user_id, department_id, year, month): Counter}.
+    """
+    contribution = defaultdict(Counter)
+    user_department = (state.assigned_to_id, state.department_id)
+    if state.created_at is not None:
+        contribution[user_department + get_month(state.created_at)][
+            'created'
+        ] += 1
+    deadline_key = user_department + get_month(state.deadline)
+    if state.status == Task.APPROVED:
+        contribution[deadline_key]['approved'] += 1
+        contribution[deadline_key]['points'] += state.reward_points
+    if state.is_overdue:
+        contribution[deadline_key]['overdue'] += 1
+    return contribution
+
+
+def collect_changes(changes):
+    """
+    Разница статистики для пар (старое состояние, новое состояние).
+    None вместо состояния означает создание или удаление задачи.
+    """
+    totals = defaultdict(Counter)
+    for old, new in changes:
+        if old is not None:
+            for key, values in get_contribution(old).items():
+                totals[key].subtract(values)
+        if new is not None:
+            for key, values in get_contribution(new).items():
+                totals[key].update(values)
+    return {
+        key: {field: value for field, value in values.items() if value}
+        for key, values in totals.items()
+        if any(values.values())
+    }
+
+
+def apply_changes(changes):
+    apply_totals(collect_changes(changes))
+
+
+def apply_totals(totals):
+    """
+    Прибавляет счетчики к строкам статистики через F(),
+    недостающие строки создаются.
+    """
+    invalidate_progress(
+        {key[2:] for key, values in totals.items() if 'approved' in values}
+    )
+    for (user_id, department_id, year, month), values in totals.items():
+        lookup = {
+            'user_id': user_id,
+            'department_id': department_id,
+            'year': year,
+            'month': month,
+        }
+        increments = {
+            field: F(field) + value for field, value in values.items()
+        }
+        rows = TaskMonthlyStats.objects.filter(**lookup)
+        if rows.update(**increments):
+            continue
+        if all(value < 0 for value in values.values()):
+            continue
+        try:
+            with transaction.atomic():
+                TaskMonthlyStats.objects.create(**lookup, **values)
+        except IntegrityError:
+            rows.update(**increments)
+
+
+def get_row_key(row):
+    return row['assigned_to'], row['department'], row['year'], row['month']
+
+
+def rebuild():
+    """
+    Пересчитывает статистику целиком по таблице задач.
+    Миграция 0010 заполняет таблицу копией этой функции.
+    """
+    totals = defaultdict(Counter)
+    tasks = Task.objects.order_by()
+    created = (
+        tasks.annotate(
+            year=ExtractYear('created_at'), month=ExtractMonth('created_at')
+        )
+        .values('assigned_to', 'department', 'year', 'month')
+        .annotate(created=Count('id'))
+    )
+    for row in created:
+        totals[get_row_key(row)]['created'] += row['created']
+    by_deadline = (
+        tasks.annotate(
+            year=ExtractYear('deadline'), month=ExtractMonth('deadline')
+        )
+        .values('assigned_to', 'department', 'year', 'month')
+        .annotate(
+            approved=Count('id', filter=Q(status=Task.APPROVED)),
+            overdue=Count('id', filter=Q(is_overdue=True)),
+            points=Sum('reward_points', filter=Q(status=Task.APPROVED)),
+        )
+    )
+    for row in by_deadline:
+        key = get_row_key(row)
+        totals[key]['approved'] += row['approved']
+        totals[key]['overdue'] += row['overdue']
+        totals[key]['points'] += row['points'] or 0
+
+    months = {key[2:] for key in totals}
+    months.update(
+        TaskMonthlyStats.objects.values_list('year', 'month').distinct()
+    )
+    invalidate_progress(months)
+    with transaction.atomic():
+        TaskMonthlyStats.objects.all().delete()
+        TaskMonthlyStats.objects.bulk_create(
+            (
+                TaskMonthlyStats(
+                    user_id=user_id,
+                    department_id=department_id,
+                    year=year,
+                    month=month,
+                    **values,
+                )
+                for (user_id, department_id, year, month), values in (
+                    totals.items()
+                )
+            ),
+            batch_size=1000,
+        )
+    return len(totals)
+
+
+def get_approved_counts(year, month, user_id, department_id):
+    """
+    Число принятых задач за месяц: всего, у пользователя и в его
+    подразделении. Считается одним aggregate() по статистике и
+    кэшируется на TASK_PROGRESS_CACHE_TIMEOUT секунд, в своем процессе
+    кэш сбрасывается сразу при изменении принятых задач месяца.
+    """
+    version = cache.get(PROGRESS_VERSION_KEY.format(year, month))
+    if version is None:
+        version = uuid4().hex
+        cache.add(PROGRESS_VERSION_KEY.format(year, month), version, None)
+    key = PROGRESS_KEY.format(year, month, version, user_id, department_id)
+    counts = cache.get(key)
+    if counts is not None:
+        return ApprovedCounts(*counts)
+    aggregates = {
+        'total': Sum('approved'),
+        'user': Sum('approved', filter=Q(user=user_id)),
+    }
+    if department_id is not None:
+        aggregates['department'] = Sum(
+            'approved', filter=Q(department=department_id)
+        )
+    values = TaskMonthlyStats.objects.filter(year=year, month=month).aggregate(
+        **aggregates
+    )
+    counts = ApprovedCounts(
+        *(values.get(field) or 0 for field in ApprovedCounts._fields)
+    )
+    cache.set(key, tuple(counts), settings.TASK_PROGRESS_CACHE_TIMEOUT)
+    return counts
+
+
+def invalidate_progress(months):
+    """
+    Меняет версию кэша прогресса для месяцев (year, month), старые
+    записи больше не читаются. Версия меняется еще раз после коммита,
+    чтобы не осталось значения, прочитанного до коммита.
+    """
+    if not months:
+        return
+
+    def invalidate():
+        cache.set_many(
+            {
+                PROGRESS_VERSION_KEY.format(year, month): uuid4().hex
+                for year, month in months
+            },
+            None,
+        )
+
+    invalidate()
+    transaction.on_commit(invalidate)
@@ -0,0 +1,73 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from tasks.models import Task
+from users.models import Position, User, UserRole
+
+
+class MarkOverdueTasksCommandTest(TestCase):
+    """
+    Тестирование пометки просроченных задач.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create(
+            email='test@mail.ru',
+            first_name='User',
+            last_name='Userov',
+            password='password',
+            role=UserRole.TEAMLEADER,
+            position=Position.SENIOR,
+            is_active=True,
+        )
+        past = timezone.now() - timedelta(days=1)
+        future = timezone.now() + timedelta(days=1)
+        tasks = {
+            'overdue_created': (past, Task.CREATED),
+            'overdue_returned': (past, Task.RETURNED),
+            'overdue_sent': (past, Task.SENT),
+            'in_time': (future, Task.CREATED),
+        }
+        for title, (deadline, status) in tasks.items():
+            Task.objects.create(
+                title=title,
+                description='Описание',
+                deadline=deadline,
+                reward_points=10,
+                team_leader=user,
+                assigned_to=user,
+                status=status,
+            )
+
+    def test_marks_only_open_overdue_tasks(self):
+        out = StringIO()
+        call_command('mark_overdue_tasks', stdout=out)
+        overdue = set(
+            Task.objects.filter(is_overdue=True).values_list(
+                'title', flat=True
+            )
+        )
+        self.assertEqual(overdue, {'overdue_created', 'overdue_returned'})
+        self.assertIn('Помечено просроченных задач: 2', out.getvalue())
+
+    def test_already_marked_tasks_are_skipped(self):
+        self.assertEqual(Task.objects.mark_overdue(), 2)
+        self.assertEqual(Task.objects.mark_overdue(), 0)
+
+    def test_update_by_locked_ids(self):
+        with CaptureQueriesContext(connection) as queries:
+            Task.objects.mark_overdue()
+        update = next(
+            query['sql']
+            for query in queries.captured_queries
+            if query['sql'].startswith('UPDATE "tasks_task"')
+        )
+        self.assertIn('"tasks_task"."id" IN', update)
+        self.assertNotIn('deadline', update)
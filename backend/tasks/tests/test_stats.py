@@ -0,0 +1,115 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from django.utils import timezone
+
+from department.models import Department
+from tasks.models import Task, TaskMonthlyStats
+from users.models import Position, User, UserRole
+
+STAT_FIELDS = (
+    'user',
+    'department',
+    'year',
+    'month',
+    'created',
+    'approved',
+    'overdue',
+    'points',
+)
+
+
+class TaskMonthlyStatsTest(TestCase):
+    """
+    Тестирование помесячной статистики задач.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name='backend')
+        cls.user = User.objects.create(
+            email='test@mail.ru',
+            first_name='User',
+            last_name='Userov',
+            password='password',
+            role=UserRole.TEAMLEADER,
+            position=Position.SENIOR,
+            is_active=True,
+            department=cls.department,
+        )
+
+    def create_task(self, **kwargs):
+        fields = {
+            'title': 'Задача',
+            'description': 'Описание',
+            'deadline': timezone.now() + timedelta(days=1),
+            'reward_points': 10,
+            'team_leader': self.user,
+            'assigned_to': self.user,
+            'department': self.department,
+        }
+        fields.update(kwargs)
+        return Task.objects.create(**fields)
+
+    def get_stats(self):
+        return set(
+            TaskMonthlyStats.objects.exclude(
+                created=0, approved=0, overdue=0, points=0
+            ).values_list(*STAT_FIELDS)
+        )
+
+    def assert_matches_rebuild(self):
+        maintained = self.get_stats()
+        call_command('rebuild_task_stats', stdout=StringIO())
+        self.assertEqual(maintained, self.get_stats())
+
+    def test_stats_follow_task_changes(self):
+        today = timezone.localtime()
+        task = self.create_task()
+        stats = TaskMonthlyStats.objects.get(
+            user=self.user, year=today.year, month=today.month
+        )
+        self.assertEqual(stats.created, 1)
+        self.assertEqual(stats.approved, 0)
+
+        task.status = Task.APPROVED
+        task.save()
+        stats.refresh_from_db()
+        self.assertEqual(stats.approved, 1)
+        self.assertEqual(stats.points, 10)
+
+        task.delete()
+        stats.refresh_from_db()
+        self.assertEqual(
+            (stats.created, stats.approved, stats.points), (0, 0, 0)
+        )
+
+    def test_maintained_stats_match_rebuild(self):
+        self.create_task(status=Task.APPROVED, reward_points=5)
+        self.create_task(
+            deadline=timezone.now() - timedelta(days=40),
+            department=None,
+        )
+        moved = self.create_task(status=Task.APPROVED)
+        moved.deadline = timezone.now() + timedelta(days=45)
+        moved.save()
+        Task.objects.mark_overdue()
+        self.assert_matches_rebuild()
+
+    def test_single_row_without_department(self):
+        TaskMonthlyStats.objects.create(user=self.user, year=2026, month=9)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            TaskMonthlyStats.objects.create(user=self.user, year=2026, month=9)
+        TaskMonthlyStats.objects.create(
+            user=self.user, department=self.department, year=2026, month=9
+        )
+
+    def test_save_without_stat_fields_skips_reload(self):
+        task = self.create_task()
+        task.title = 'Новое название'
+        with self.assertNumQueries(1):
+            task.save(update_fields=['title'])
+        self.assert_matches_rebuild()
@@ -1,9 +1,10 @@
 import datetime
 
-from datetime import date
+from collections import defaultdict
 
+from core.pagination import KeysetPagination
 from django.db import transaction
-from django.db.models import Q
+from django.db.models import Count, F, Q
 from django.utils import timezone
 from drf_spectacular.utils import extend_schema, extend_schema_view
 from rest_framework import permissions, status, viewsets
@@ -12,14 +13,20 @@ from rest_framework.response import Response
 
 from department.models import Department
 from notifications.models import Notification
+from tasks import stats
+from tasks.export import ExportContentNegotiation, stream_tasks
 from tasks.models import Task
 from tasks.permissions import IsTeamleader
 from tasks.schema import task_schema
 from tasks.serializers import (
+    TaskBatchReviewSerializer,
+    TaskBulkCreateSerializer,
     TaskCreateSerializer,
+    TaskExportSerializer,
     TaskReviewSerializer,
     TaskSerializer,
 )
+from users.achievements import get_month_bounds
 from users.models import Achievement, User, UserAchievement
 
 
@@ -28,6 +35,9 @@ from users.models import Achievement, User, UserAchievement
 class TaskViewSet(viewsets.ModelViewSet):
     serializer_class = TaskSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    BULK_CREATE_MAX_TASKS = 100
+    REVIEW_MAX_TASKS = 500
 
     def get_permissions(self):
         if self.action in ['create', 'destroy', 'update', 'partial_update']:
@@ -35,15 +45,6 @@ class TaskViewSet(viewsets.ModelViewSet):
         else:
             return super().get_permissions()
 
-    def update_overdue_tasks(self):
-        overdue_tasks = Task.objects.filter(
-            deadline__lt=timezone.now(),
-            status__in=[Task.CREATED, Task.RETURNED],
-        )
-        for task in overdue_tasks:
-            task.is_overdue = True
-            task.save()
-
     def create(self, request):
         serializer = TaskCreateSerializer(
             data=request.data, context={'request': request}
@@ -78,15 +79,42 @@ class TaskViewSet(viewsets.ModelViewSet):
                 serializer.errors, status=status.HTTP_400_BAD_REQUEST
             )
 
+    @action(
+        detail=False,
+        methods=['POST'],
+        permission_classes=[IsTeamleader],
+        serializer_class=TaskBulkCreateSerializer,
+    )
+    def bulk(self, request):
+        serializer = TaskBulkCreateSerializer(
+            data=request.data,
+            many=True,
+            max_length=self.BULK_CREATE_MAX_TASKS,
+            context={'request': request},
+        )
+        if not serializer.is_valid():
+            return Response(
+                serializer.errors, status=status.HTTP_400_BAD_REQUEST
+            )
+        with transaction.atomic():
+            tasks = serializer.save()
+        return Response(
+            {'message': 'Задачи успешно созданы', 'count': len(tasks)},
+            status=status.HTTP_201_CREATED,
+        )
+
     @action(detail=True, methods=['POST'], serializer_class=None)
     def send_for_review(self, request, pk=None):
         task = self.get_object()
         user = request.user
 
         if user == task.assigned_to:
-            if task.status in [Task.CREATED, Task.RETURNED]:
-                task.status = Task.SENT
-                task.save()
+            # Статистика не считает задачи в этих статусах, поэтому
+            # статус меняется UPDATE без сигналов и пересчета.
+            sent = Task.objects.filter(
+                pk=task.pk, status__in=[Task.CREATED, Task.RETURNED]
+            ).update(status=Task.SENT)
+            if sent:
                 Notification.objects.create(
                     user=task.team_leader,
                     message=(
@@ -124,74 +152,225 @@ class TaskViewSet(viewsets.ModelViewSet):
     )
     def review_task(self, request, pk=None):
         task = self.get_object()
-        if task.status == Task.APPROVED:
+        serializer = TaskReviewSerializer(data=request.data)
+        if not serializer.is_valid():
             return Response(
-                {'error': 'Задача уже была принята и выполнена'},
-                status=status.HTTP_400_BAD_REQUEST,
+                serializer.errors, status=status.HTTP_400_BAD_REQUEST
             )
+        review_status = serializer.validated_data['review_status']
 
-        serializer = TaskReviewSerializer(data=request.data)
-        if serializer.is_valid():
-            review_status = serializer.validated_data['review_status']
+        with transaction.atomic():
+            updated = Task.objects.filter(pk=task.pk, status=Task.SENT).update(
+                status=review_status
+            )
+            if not updated:
+                if task.status == Task.APPROVED:
+                    error = 'Задача уже была принята и выполнена'
+                else:
+                    error = (
+                        'Проверить можно только задачу со статусом '
+                        f'"{Task.SENT}"'
+                    )
+                return Response(
+                    {'error': error}, status=status.HTTP_400_BAD_REQUEST
+                )
 
-            if review_status == Task.APPROVED:
-                with transaction.atomic():
-                    task.status = Task.APPROVED
-                    task.save()
-                    assigned_user = task.assigned_to
-                    assigned_user.completed_tasks_count += 1
-                    assigned_user.reward_points += task.reward_points
-                    assigned_user.reward_points_for_current_month += (
-                        task.reward_points
+            stats.apply_changes(
+                [
+                    (
+                        stats.get_state(task, status=Task.SENT),
+                        stats.get_state(task, status=review_status),
                     )
-                    assigned_user.save()
+                ]
+            )
+            if review_status == Task.APPROVED:
+                User.objects.filter(pk=task.assigned_to_id).update(
+                    completed_tasks_count=F('completed_tasks_count') + 1,
+                    reward_points=F('reward_points') + task.reward_points,
+                    reward_points_for_current_month=(
+                        F('reward_points_for_current_month')
+                        + task.reward_points
+                    ),
+                )
+                self.assign_achivements([task.assigned_to_id])
+                message = f'Задача "{task.title}" была принята и выполнена'
+            else:
+                message = f'Задача "{task.title}" была возвращена на доработку'
+            Notification.objects.bulk_create(
+                [
+                    Notification(user_id=task.team_leader_id, message=message),
+                    Notification(user_id=task.assigned_to_id, message=message),
+                ]
+            )
 
-                    self.assign_achivements(assigned_user)
+        if review_status == Task.APPROVED:
+            return Response(
+                {'message': 'Принята и выполнена'}, status=status.HTTP_200_OK
+            )
+        return Response(
+            {'message': 'Задача возвращена на доработку'},
+            status=status.HTTP_200_OK,
+        )
 
-                    Notification.objects.create(
-                        user=task.team_leader,
-                        message=(
-                            f'Задача "{task.title}" была принята и выполнена'
-                        ),
-                    )
-                    Notification.objects.create(
-                        user=task.assigned_to,
-                        message=(
-                            f'Задача "{task.title}" была принята и выполнена'
-                        ),
-                    )
-                return Response(
-                    {'message': 'Принята и выполнена'},
-                    status=status.HTTP_200_OK,
+    @action(
+        detail=False,
+        methods=['POST'],
+        permission_classes=[IsTeamleader],
+        serializer_class=TaskBatchReviewSerializer,
+    )
+    def review_batch(self, request):
+        serializer = TaskBatchReviewSerializer(
+            data=request.data, many=True, max_length=self.REVIEW_MAX_TASKS
+        )
+        if not serializer.is_valid():
+            return Response(
+                serializer.errors, status=status.HTTP_400_BAD_REQUEST
+            )
+        decisions = {
+            item['task']: item['review_status']
+            for item in serializer.validated_data
+        }
+
+        with transaction.atomic():
+            tasks = list(self.get_review_queryset(decisions))
+            approved = [
+                task for task in tasks if decisions[task.id] == Task.APPROVED
+            ]
+            returned = [
+                task for task in tasks if decisions[task.id] == Task.RETURNED
+            ]
+            totals = defaultdict(lambda: {'count': 0, 'points': 0})
+            for task in approved:
+                totals[task.assigned_to_id]['count'] += 1
+                totals[task.assigned_to_id]['points'] += task.reward_points
+            list(
+                User.objects.select_for_update()
+                .filter(id__in=totals)
+                .order_by('id')
+                .values_list('id', flat=True)
+            )
+
+            for review_status, reviewed in (
+                (Task.APPROVED, approved),
+                (Task.RETURNED, returned),
+            ):
+                if reviewed:
+                    Task.objects.filter(
+                        id__in=[task.id for task in reviewed]
+                    ).update(status=review_status)
+            stats.apply_changes(
+                (
+                    stats.get_state(task),
+                    stats.get_state(task, status=decisions[task.id]),
                 )
-            elif review_status == Task.RETURNED:
-                task.status = Task.RETURNED
-                task.save()
-                Notification.objects.create(
-                    user=task.team_leader,
-                    message=(
-                        f'Задача "{task.title}" была возвращена на доработку'
+                for task in approved + returned
+            )
+            for user_id, total in totals.items():
+                User.objects.filter(id=user_id).update(
+                    completed_tasks_count=(
+                        F('completed_tasks_count') + total['count']
+                    ),
+                    reward_points=F('reward_points') + total['points'],
+                    reward_points_for_current_month=(
+                        F('reward_points_for_current_month') + total['points']
                     ),
                 )
+            self.assign_achivements(list(totals))
 
-                Notification.objects.create(
-                    user=task.assigned_to,
-                    message=(
-                        f'Задача "{task.title}" была возвращена на доработку'
-                    ),
+            notifications = []
+            for template, reviewed in (
+                ('Задача "{}" была принята и выполнена', approved),
+                ('Задача "{}" была возвращена на доработку', returned),
+            ):
+                for task in reviewed:
+                    message = template.format(task.title)
+                    notifications.append(
+                        Notification(
+                            user_id=task.team_leader_id, message=message
+                        )
+                    )
+                    notifications.append(
+                        Notification(
+                            user_id=task.assigned_to_id, message=message
+                        )
+                    )
+            Notification.objects.bulk_create(notifications)
+
+        reviewed_ids = {task.id for task in tasks}
+        results = []
+        for task_id, review_status in decisions.items():
+            if task_id in reviewed_ids:
+                results.append({'task': task_id, 'status': review_status})
+            else:
+                results.append(
+                    {
+                        'task': task_id,
+                        'error': (
+                            'Задача не найдена или ее статус не '
+                            f'"{Task.SENT}"'
+                        ),
+                    }
                 )
+        return Response({'results': results}, status=status.HTTP_200_OK)
 
-                return Response(
-                    {'message': 'Задача возвращена на доработку'},
-                    status=status.HTTP_200_OK,
+    @action(
+        detail=False,
+        methods=['GET'],
+        permission_classes=[IsTeamleader],
+        content_negotiation_class=ExportContentNegotiation,
+        pagination_class=None,
+    )
+    def export(self, request):
+        """
+        Потоковая выгрузка задач в CSV или NDJSON.
+        При Accept-Encoding: gzip ответ сжимается на лету.
+        """
+        serializer = TaskExportSerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(
+                serializer.errors, status=status.HTTP_400_BAD_REQUEST
+            )
+        params = serializer.validated_data
+        queryset = self.get_queryset()
+        if 'department' in params:
+            queryset = queryset.filter(department__name=params['department'])
+        if 'date_from' in params:
+            queryset = queryset.filter(
+                deadline__gte=self.get_day_start(params['date_from'])
+            )
+        if 'date_to' in params:
+            queryset = queryset.filter(
+                deadline__lt=self.get_day_start(
+                    params['date_to'] + datetime.timedelta(days=1)
                 )
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            )
+        gzip = 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '')
+        return stream_tasks(queryset, params['export_format'], gzip=gzip)
+
+    def get_review_queryset(self, task_ids):
+        """
+        Задачи на проверке, заблокированные для пакетной проверки.
+        Подразделение подтягивается LEFT JOIN, а PostgreSQL не блокирует
+        строки nullable стороны внешнего соединения, поэтому блокируется
+        только таблица задач.
+        """
+        return (
+            self.get_queryset()
+            .select_for_update(of=('self',))
+            .filter(id__in=task_ids, status=Task.SENT)
+            .order_by('id')
+        )
+
+    @staticmethod
+    def get_day_start(day):
+        return timezone.make_aware(
+            datetime.datetime.combine(day, datetime.time.min)
+        )
 
     def get_queryset(self):
-        self.update_overdue_tasks()
         queryset = Task.objects.filter(
             Q(assigned_to=self.request.user) | Q(team_leader=self.request.user)
-        )
+        ).select_related('department')
         status = self.request.query_params.get('status')
         if status:
             queryset = queryset.filter(status=status)
@@ -200,35 +379,61 @@ class TaskViewSet(viewsets.ModelViewSet):
         if is_overdue:
             queryset = queryset.filter(deadline__lt=datetime.date.today())
 
+        search = self.request.query_params.get('search')
+        if search:
+            queryset = queryset.search(search)
+            self.pagination_ordering = ('-search_rank', '-id')
+
         return queryset
 
-    def assign_achivements(self, user):
+    def assign_achivements(self, user_ids):
         """
         Назначение достижений при изменении статуса задачи на \"Принято\".
+        Количество принятых задач считается одним запросом для всех
+        переданных пользователей.
         """
-        current_year = date.today().year
-        current_month = date.today().month
-        try:
-            achieve_work_quality = Achievement.objects.get(
-                name='Качество работы'
-            )
-        except Achievement.DoesNotExist:
+        start_of_month, next_month = get_month_bounds(timezone.localdate())
+        achieve_work_quality = Achievement.objects.filter(
+            name='Качество работы'
+        ).first()
+        if achieve_work_quality is None:
             return
-        tasks_count = Task.objects.filter(
-            assigned_to=user.id,
-            deadline__month=current_month,
-            deadline__year=current_year,
-            status=Task.APPROVED,
-            is_overdue=False,
-        ).count()
-        if tasks_count >= 30:
-            _, created = UserAchievement.objects.get_or_create(
-                user=user,
-                achievement=achieve_work_quality,
+        qualified_ids = set(
+            Task.objects.filter(
+                assigned_to__in=user_ids,
+                deadline__gte=start_of_month,
+                deadline__lt=next_month,
+                status=Task.APPROVED,
+                is_overdue=False,
             )
-            if created:
-                user.reward_points += achieve_work_quality.value
-                user.reward_points_for_current_month += (
-                    achieve_work_quality.value
+            .order_by()
+            .values('assigned_to')
+            .annotate(tasks_count=Count('id'))
+            .filter(tasks_count__gte=30)
+            .values_list('assigned_to', flat=True)
+        )
+        if not qualified_ids:
+            return
+        qualified_ids -= set(
+            UserAchievement.objects.filter(
+                achievement=achieve_work_quality, user__in=qualified_ids
+            ).values_list('user', flat=True)
+        )
+        if not qualified_ids:
+            return
+        UserAchievement.objects.bulk_create(
+            [
+                UserAchievement(
+                    user_id=user_id, achievement=achieve_work_quality
                 )
-                user.save()
+                for user_id in qualified_ids
+            ],
+            ignore_conflicts=True,
+        )
+        User.objects.filter(id__in=qualified_ids).update(
+            reward_points=F('reward_points') + achieve_work_quality.value,
+            reward_points_for_current_month=(
+                F('reward_points_for_current_month')
+                + achieve_work_quality.value
+            ),
+        )
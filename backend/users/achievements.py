@@ -0,0 +1,128 @@
+from collections import defaultdict
+from datetime import datetime, time
+
+from dateutil.relativedelta import relativedelta  # type: ignore
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from tasks.models import Task
+from users.models import Achievement, User, UserAchievement
+
+NO_DELAY_ACHIEVEMENT = 'Соблюдение дедлайна'
+
+
+def get_or_create_achievements(items):
+    """
+    Достижения по названиям из items одним запросом, недостающие
+    создаются через bulk_create. Возвращает {название: Achievement}.
+    Для существующих достижений обновляется только изображение.
+    """
+    unique = {}
+    for item in items:
+        unique.setdefault(item['name'], item)
+    items = unique
+    achievements = {
+        achievement.name: achievement
+        for achievement in Achievement.objects.filter(name__in=items)
+    }
+    missing = [name for name in items if name not in achievements]
+    if missing:
+        Achievement.objects.bulk_create(
+            [
+                Achievement(
+                    name=name,
+                    value=items[name].get('value', 1),
+                    description=items[name].get('description', ''),
+                    image=items[name].get('image') or '',
+                )
+                for name in missing
+            ],
+            ignore_conflicts=True,
+        )
+        achievements.update(
+            (achievement.name, achievement)
+            for achievement in Achievement.objects.filter(name__in=missing)
+        )
+    for name, item in items.items():
+        if item.get('image') and name not in missing:
+            achievement = achievements[name]
+            achievement.image = item['image']
+            achievement.save(update_fields=['image'])
+    return achievements
+
+
+def grant_achievements(user_ids, achievements):
+    """
+    Выдает достижения пользователям и начисляет их баллы.
+    Строки пользователей блокируются, поэтому параллельная выдача
+    того же достижения не начислит баллы дважды.
+    Возвращает {user_id: [выданные сейчас достижения]} для найденных
+    пользователей.
+    """
+    with transaction.atomic():
+        user_ids = list(
+            User.objects.select_for_update()
+            .filter(id__in=user_ids)
+            .order_by('id')
+            .values_list('id', flat=True)
+        )
+        existing = set(
+            UserAchievement.objects.filter(
+                user__in=user_ids, achievement__in=achievements
+            ).values_list('user_id', 'achievement_id')
+        )
+        granted = {user_id: [] for user_id in user_ids}
+        for user_id in user_ids:
+            for achievement in achievements:
+                if (user_id, achievement.id) not in existing:
+                    granted[user_id].append(achievement)
+        UserAchievement.objects.bulk_create(
+            [
+                UserAchievement(user_id=user_id, achievement=achievement)
+                for user_id, new in granted.items()
+                for achievement in new
+            ],
+            ignore_conflicts=True,
+        )
+
+        users_by_points = defaultdict(list)
+        for user_id, new in granted.items():
+            points = sum(achievement.value for achievement in new)
+            if points:
+                users_by_points[points].append(user_id)
+        for points, ids in users_by_points.items():
+            User.objects.filter(id__in=ids).update(
+                reward_points=F('reward_points') + points,
+                reward_points_for_current_month=(
+                    F('reward_points_for_current_month') + points
+                ),
+            )
+    return granted
+
+
+def get_month_bounds(day):
+    """Начало месяца day и начало следующего в текущей временной зоне."""
+    start = day.replace(day=1)
+    return (
+        timezone.make_aware(datetime.combine(start, time.min)),
+        timezone.make_aware(
+            datetime.combine(start + relativedelta(months=1), time.min)
+        ),
+    )
+
+
+def get_no_delay_user_ids(day):
+    """
+    Исполнители, у которых есть задачи с дедлайном в месяце day и ни
+    одна из них не просрочена. Один GROUP BY по диапазону дедлайнов.
+    """
+    start, end = get_month_bounds(day)
+    return list(
+        Task.objects.filter(deadline__gte=start, deadline__lt=end)
+        .order_by()
+        .values('assigned_to')
+        .annotate(overdue=Count('id', filter=Q(is_overdue=True)))
+        .filter(overdue=0)
+        .values_list('assigned_to', flat=True)
+    )
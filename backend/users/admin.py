@@ -147,13 +147,7 @@ class CustomUserAdmin(ImportExportModelAdmin):
         'experience',
         'department',
     )
-    search_fields = (
-        'email',
-        'is_active',
-        'position',
-        'experience',
-        'department',
-    )
+    search_fields = ('email', 'first_name', 'last_name')
     resource_classes = [UserResource]
     # filter_vertical = ('department',)
     fieldsets = (
@@ -217,6 +211,16 @@ class CustomUserAdmin(ImportExportModelAdmin):
     )
     inlines = [HardskillInline, AchievementInline]
 
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Поиск по тем же индексам, что и параметр q в API.
+        """
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        found = queryset.search(search_term).values('id')
+        return queryset.filter(id__in=found), False
+
 
 admin.site.register(User, CustomUserAdmin)
 admin.site.register(Hardskill, HardskillAdmin)
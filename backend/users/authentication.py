@@ -0,0 +1,128 @@
+import copy
+import threading
+
+from collections import OrderedDict
+from time import monotonic
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+
+
+class TokenCache:
+    """
+    LRU-кэш токен -> пользователь с временем жизни записи.
+    Кэш свой у каждого процесса: сигналы сбрасывают записи только в
+    текущем процессе, в остальных запись живет не дольше ttl секунд.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._keys_by_user = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < monotonic():
+                if entry is not None:
+                    self._pop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def set(self, key, user, token):
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            self._pop(key)
+            self._entries[key] = (monotonic() + self.ttl, user, token)
+            self._keys_by_user.setdefault(user.pk, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._pop(next(iter(self._entries)))
+
+    def invalidate(self, key):
+        with self._lock:
+            self._pop(key)
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            for key in list(self._keys_by_user.get(user_id, ())):
+                self._pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+            }
+
+    def _pop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        keys = self._keys_by_user.get(entry[1].pk)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[entry[1].pk]
+
+
+token_cache = TokenCache(settings.TOKEN_CACHE_SIZE, settings.TOKEN_CACHE_TTL)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication, который не ходит в базу за известным токеном.
+    Каждый запрос получает свою копию пользователя из кэша.
+    Истекший токен отклоняется, действующий продлевается не чаще
+    раза в TOKEN_REFRESH_INTERVAL.
+    """
+
+    def get_model(self):
+        # Модуль импортируется из настроек DRF до загрузки приложений.
+        from users.models import ExpiringToken
+
+        return ExpiringToken
+
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is None:
+            user, token = super().authenticate_credentials(key)
+            token_cache.set(key, user, token)
+        else:
+            user, token = cached
+            user = copy.copy(user)
+        self.check_expiry(token)
+        return user, token
+
+    def check_expiry(self, token):
+        from users.models import get_token_expiry_cutoff
+
+        cutoff = get_token_expiry_cutoff()
+        if cutoff is None:
+            return
+        if token.created < cutoff:
+            token_cache.invalidate(token.key)
+            raise AuthenticationFailed('Срок действия токена истек.')
+        now = timezone.now()
+        if token.created < now - settings.TOKEN_REFRESH_INTERVAL:
+            self.get_model().objects.filter(key=token.key).update(created=now)
+            token.created = now
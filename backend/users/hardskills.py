@@ -0,0 +1,106 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+from users.models import Hardskill, UserHardskill
+
+USAGE_CACHE_KEY = 'hardskill_usage:{}'
+
+
+def get_or_create_hardskills(names):
+    """
+    Навыки по названиям одним запросом, недостающие создаются через
+    bulk_create. Уникальность названия защищает от дублей при
+    параллельном создании. Возвращает навыки в порядке names.
+    """
+    names = list(dict.fromkeys(names))
+    hardskills = {
+        hardskill.name: hardskill
+        for hardskill in Hardskill.objects.filter(name__in=names)
+    }
+    missing = [name for name in names if name not in hardskills]
+    if missing:
+        Hardskill.objects.bulk_create(
+            [
+                Hardskill(name=name, search_name=name.casefold())
+                for name in missing
+            ],
+            ignore_conflicts=True,
+        )
+        hardskills.update(
+            (hardskill.name, hardskill)
+            for hardskill in Hardskill.objects.filter(name__in=missing)
+        )
+    return [hardskills[name] for name in names]
+
+
+def parse_skill_names(value):
+    """
+    Названия навыков из строки через запятую в виде search_name,
+    чтобы сравнение не зависело от регистра.
+    """
+    return list(
+        dict.fromkeys(
+            name.strip().casefold()
+            for name in value.split(',')
+            if name.strip()
+        )
+    )
+
+
+def users_with_all_skills(names):
+    """
+    Подзапрос id пользователей, у которых есть все навыки names.
+    Считается одним GROUP BY по UserHardskill с HAVING COUNT = k.
+    """
+    return (
+        UserHardskill.objects.filter(hardskill__search_name__in=names)
+        .values('user')
+        .annotate(matched=Count('hardskill__search_name', distinct=True))
+        .filter(matched=len(names))
+        .values('user')
+    )
+
+
+def search_hardskills(prefix, limit=None):
+    """
+    Навыки, название которых начинается с prefix, с числом
+    пользователей. Число пользователей по навыку берется из кэша,
+    недостающие считаются одним запросом.
+    """
+    limit = limit or settings.HARDSKILL_AUTOCOMPLETE_LIMIT
+    hardskills = list(
+        Hardskill.objects.filter(
+            search_name__startswith=prefix.casefold()
+        ).order_by('search_name', 'name')[:limit]
+    )
+    counts = get_usage_counts([hardskill.id for hardskill in hardskills])
+    for hardskill in hardskills:
+        hardskill.users_count = counts[hardskill.id]
+    return hardskills
+
+
+def get_usage_counts(ids):
+    """Возвращает {id навыка: число пользователей с этим навыком}."""
+    keys = {USAGE_CACHE_KEY.format(pk): pk for pk in ids}
+    cached = cache.get_many(keys)
+    counts = {keys[key]: value for key, value in cached.items()}
+    missing = [pk for pk in ids if pk not in counts]
+    if missing:
+        fresh = dict.fromkeys(missing, 0)
+        fresh.update(
+            UserHardskill.objects.filter(hardskill__in=missing)
+            .values('hardskill')
+            .annotate(users_count=Count('user'))
+            .values_list('hardskill', 'users_count')
+        )
+        cache.set_many(
+            {USAGE_CACHE_KEY.format(pk): count for pk, count in fresh.items()},
+            settings.HARDSKILL_USAGE_CACHE_TIMEOUT,
+        )
+        counts.update(fresh)
+    return counts
+
+
+def invalidate_usage_counts(ids):
+    cache.delete_many([USAGE_CACHE_KEY.format(pk) for pk in ids])
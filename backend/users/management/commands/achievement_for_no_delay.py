@@ -1,28 +1,66 @@
-from datetime import date
+from time import monotonic
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
 
-from users.models import Achievement, User, UserAchievement
+from users.achievements import (
+    NO_DELAY_ACHIEVEMENT,
+    get_no_delay_user_ids,
+    grant_achievements,
+)
+from users.models import Achievement, UserAchievement
 
 
 class Command(BaseCommand):
-    help = 'Выдача достижений всем пользователям без просроченных заданий.'
-
-    def handle(self, *args, **kwargs):
-        current_year = date.today().year
-        current_month = date.today().month
-        all_users = User.objects.filter(
-            assigned_tasks__is_overdue=False,
-            assigned_tasks__deadline__month=current_month,
-            assigned_tasks__deadline__year=current_year,
-        ).distinct()
-        achievement = Achievement.objects.get(name='Соблюдение дедлайна')
-        for user in all_users:
-            UserAchievement.objects.create(user=user, achievement=achievement)
-            user.reward_points += achievement.value
-            user.reward_points_for_current_month += achievement.value
-            user.save()
+    help = (
+        'Выдача достижения "Соблюдение дедлайна" пользователям, у которых '
+        'нет просроченных задач с дедлайном в текущем месяце. Повторный '
+        'запуск не выдает достижение и баллы второй раз.'
+    )
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только посчитать пользователей, ничего не меняя.',
+        )
+
+    def handle(self, *args, **options):
+        achievement = Achievement.objects.filter(
+            name=NO_DELAY_ACHIEVEMENT
+        ).first()
+        if achievement is None:
+            raise CommandError(
+                f'Нет достижения "{NO_DELAY_ACHIEVEMENT}", '
+                f'создайте его командой fill_db_achivements.'
+            )
+
+        started = monotonic()
+        user_ids = get_no_delay_user_ids(timezone.localdate())
+        select_duration = monotonic() - started
+        self.stdout.write(
+            f'Подходят пользователей: {len(user_ids)}, выборка за '
+            f'{select_duration:.3f} с.'
+        )
+
+        if options['dry_run']:
+            started = monotonic()
+            already = UserAchievement.objects.filter(
+                achievement=achievement, user__in=user_ids
+            ).count()
+            self.stdout.write(
+                f'Уже получили: {already}, будет выдано: '
+                f'{len(user_ids) - already}, проверка за '
+                f'{monotonic() - started:.3f} с.'
+            )
+            return
+
+        started = monotonic()
+        granted = grant_achievements(user_ids, [achievement])
+        awarded = sum(1 for new in granted.values() if new)
         self.stdout.write(
-            self.style.SUCCESS('Достижения "Соблюдение дедайна" выданы.')
+            self.style.SUCCESS(
+                f'Достижение "{NO_DELAY_ACHIEVEMENT}" выдано: {awarded}, '
+                f'выдача за {monotonic() - started:.3f} с.'
+            )
         )
@@ -0,0 +1,99 @@
+import random
+
+from datetime import datetime, timedelta, timezone
+from statistics import median
+from time import perf_counter
+
+from core.utils import (
+    _format_time_passed,
+    how_much_time_has_passed,
+    to_utc_date,
+)
+from django.core.management.base import BaseCommand
+
+from users.models import User
+from users.serializers import UserListSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        'Замер форматирования стажа (experience, general_experience) '
+        'для списка пользователей без кэша, с кэшем и через сериализатор.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10_000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        now = datetime.now(timezone.utc)
+        users = [
+            User(
+                id=number,
+                experience=now - timedelta(days=random.randint(0, 3650)),
+                general_experience=(
+                    now - timedelta(days=random.randint(0, 7300))
+                ),
+            )
+            for number in range(options['users'])
+        ]
+        fields = ('experience', 'general_experience')
+        today = now.date()
+
+        def uncached():
+            for user in users:
+                for field in fields:
+                    _format_time_passed.__wrapped__(
+                        today, to_utc_date(getattr(user, field))
+                    )
+
+        def cached():
+            for user in users:
+                for field in fields:
+                    how_much_time_has_passed(getattr(user, field))
+
+        def serializer():
+            return UserListSerializer(
+                users, many=True, context={'fields': ('id', *fields)}
+            ).data
+
+        uncached_time = self.measure(
+            'Построчно без кэша', uncached, options['repeat']
+        )
+        cached_time = self.measure(
+            'Построчно с кэшем', cached, options['repeat']
+        )
+        cold_time = self.measure(
+            'Сериализатор, пустой кэш',
+            serializer,
+            options['repeat'],
+            clear=True,
+        )
+        warm_time = self.measure(
+            'Сериализатор, заполненный кэш', serializer, options['repeat']
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Форматирование с кэшем быстрее в '
+                f'{uncached_time / cached_time:.1f} раза, сериализация '
+                f'списка — в {cold_time / warm_time:.1f} раза.'
+            )
+        )
+
+    def measure(self, title, func, repeat, clear=False):
+        _format_time_passed.cache_clear()
+        func()
+        timings = []
+        for _ in range(repeat):
+            if clear:
+                _format_time_passed.cache_clear()
+            started = perf_counter()
+            func()
+            timings.append((perf_counter() - started) * 1000)
+        self.stdout.write(
+            f'{title}: медиана {median(timings):.1f} мс, '
+            f'минимум {min(timings):.1f} мс'
+        )
+        return median(timings)
@@ -0,0 +1,78 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIRequestFactory
+
+from users.authentication import CachedTokenAuthentication, token_cache
+from users.models import User
+from users.views import ShortUserProfileViewSet
+
+
+class Command(BaseCommand):
+    help = (
+        'Замер запросов в секунду к /api/curent_user_info/ с обычной '
+        'TokenAuthentication и с кэшем токенов. Тестовый пользователь '
+        'создается в транзакции, которая откатывается.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            user = User.objects.create(
+                email='benchmark-token@mail.ru',
+                first_name='Benchmark',
+                last_name='Benchmark',
+                password='password',
+                is_active=True,
+            )
+            token = Token.objects.create(user=user)
+            plain = self.measure(
+                'TokenAuthentication',
+                TokenAuthentication,
+                token.key,
+                options['requests'],
+            )
+            cached = self.measure(
+                'CachedTokenAuthentication',
+                CachedTokenAuthentication,
+                token.key,
+                options['requests'],
+            )
+            transaction.set_rollback(True)
+        token_cache.clear()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'С кэшем токенов в {cached / plain:.2f} раза больше '
+                f'запросов в секунду.'
+            )
+        )
+
+    def measure(self, title, authentication_class, key, count):
+        view = ShortUserProfileViewSet.as_view(
+            {'get': 'list'}, authentication_classes=[authentication_class]
+        )
+        factory = APIRequestFactory()
+        token_cache.clear()
+
+        def request():
+            response = view(
+                factory.get(
+                    '/api/curent_user_info/',
+                    HTTP_AUTHORIZATION=f'Token {key}',
+                )
+            )
+            response.render()
+            return response
+
+        request()
+        started = perf_counter()
+        for _ in range(count):
+            request()
+        rps = count / (perf_counter() - started)
+        self.stdout.write(f'{title}: {rps:.0f} запросов в секунду')
+        return rps
@@ -0,0 +1,34 @@
+from time import monotonic
+
+from django.core.management.base import BaseCommand
+
+from users.models import ExpiringToken
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаление истекших токенов авторизации пачками, чтобы не '
+        'держать блокировку таблицы токенов долго.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0.1,
+            help='Пауза между пачками в секундах.',
+        )
+
+    def handle(self, *args, **options):
+        started = monotonic()
+        deleted = ExpiringToken.objects.delete_expired(
+            batch_size=options['batch_size'], pause=options['pause']
+        )
+        duration = monotonic() - started
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Удалено истекших токенов: {deleted} за {duration:.3f} с.'
+            )
+        )
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from users import ranking
+
+
+class Command(BaseCommand):
+    help = 'Пересчет таблицы мест пользователей в общем рейтинге.'
+
+    def handle(self, *args, **kwargs):
+        count = ranking.refresh_ranks()
+        self.stdout.write(
+            self.style.SUCCESS(f'Места в рейтинге пересчитаны: {count}.')
+        )
@@ -1,31 +1,54 @@
-from datetime import date
+from datetime import datetime
+from time import monotonic
 
-from dateutil.relativedelta import relativedelta  # type: ignore
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 
-from users.models import User
+from users.monthly_reset import get_previous_month, reset_month
 
 
 class Command(BaseCommand):
     help = (
-        'Reset monthly reward points for all users and clear user achievements'
+        'Ежемесячный сброс: итоги пользователей архивируются, баллы за '
+        'месяц обнуляются, достижения удаляются. Работает пачками, '
+        'прерванный сброс продолжается с места остановки.'
     )
 
-    def handle(self, *args, **kwargs):
-        today = date.today()
-        today.replace(day=1)
-        today + relativedelta(day=31)
-
-        # Reset monthly reward points for all users
-        User.objects.update(reward_points_for_current_month=0)
-
-        # Clear user achievements
-        User.objects.all().prefetch_related('achievements').update(
-            achievements=None
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--month',
+            help='Архивируемый месяц YYYY-MM, по умолчанию прошлый.',
+        )
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0.1,
+            help='Пауза между пачками в секундах.',
         )
 
+    def handle(self, *args, **options):
+        if options['month']:
+            try:
+                month = datetime.strptime(options['month'], '%Y-%m').date()
+            except ValueError as error:
+                raise CommandError(
+                    'Месяц указывается в формате YYYY-MM.'
+                ) from error
+        else:
+            month = get_previous_month()
+
+        started = monotonic()
+        counts = reset_month(
+            month.year,
+            month.month,
+            chunk_size=options['chunk_size'],
+            pause=options['pause'],
+        )
         self.stdout.write(
             self.style.SUCCESS(
-                'Monthly reward points and user achievements reset complete.'
+                f'Сброс за {month:%Y-%m}: обнулены баллы у {counts["users"]} '
+                f'пользователей, в архиве {counts["archived"]} итогов, '
+                f'удалено достижений: {counts["achievements"]}, '
+                f'за {monotonic() - started:.3f} с.'
             )
         )
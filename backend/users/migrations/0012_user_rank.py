@@ -0,0 +1,29 @@
+# Generated by Django 3.2.25 on 2026-10-18 02:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0011_auto_20231210_1335'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserRank',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='cached_rank', serialize=False, to='users.user', verbose_name='Пользователь')),
+                ('rank', models.PositiveIntegerField(db_index=True, verbose_name='Место')),
+            ],
+            options={
+                'verbose_name': 'Место в рейтинге',
+                'verbose_name_plural': 'Места в рейтинге',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-reward_points', 'email'], name='user_points_email_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.25 on 2026-10-18 02:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0012_user_rank'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-reward_points_for_current_month', 'email'], name='user_month_points_email_idx'),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 3.2.25 on 2026-10-18 02:46
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+SEARCH_FIELDS = ('email', 'first_name', 'last_name')
+
+POSTGRESQL_FORWARDS = [
+    f"""
+    CREATE INDEX user_{field}_trgm_idx ON users_user
+    USING gin (UPPER({field}::text) gin_trgm_ops)
+    """
+    for field in SEARCH_FIELDS
+]
+POSTGRESQL_BACKWARDS = [
+    f'DROP INDEX IF EXISTS user_{field}_trgm_idx' for field in SEARCH_FIELDS
+]
+
+SQLITE_FORWARDS = [
+    f"""
+    CREATE INDEX user_{field}_nocase_idx ON users_user
+    ({field} COLLATE NOCASE)
+    """
+    for field in SEARCH_FIELDS
+]
+SQLITE_BACKWARDS = [
+    f'DROP INDEX IF EXISTS user_{field}_nocase_idx' for field in SEARCH_FIELDS
+]
+
+
+def run_vendor_sql(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0013_user_month_points_index'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(
+            run_vendor_sql(
+                {
+                    'postgresql': POSTGRESQL_FORWARDS,
+                    'sqlite': SQLITE_FORWARDS,
+                }
+            ),
+            run_vendor_sql(
+                {
+                    'postgresql': POSTGRESQL_BACKWARDS,
+                    'sqlite': SQLITE_BACKWARDS,
+                }
+            ),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 3.2.25 on 2026-10-18 02:49
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def merge_duplicate_achievements(apps, schema_editor):
+    """
+    Оставляет одно достижение на каждое название (с наименьшим id)
+    и переносит на него выдачи дубликатов.
+    """
+    Achievement = apps.get_model('users', 'Achievement')
+    UserAchievement = apps.get_model('users', 'UserAchievement')
+    duplicates = (
+        Achievement.objects.values('name')
+        .annotate(keep_id=Min('id'), count=Count('id'))
+        .filter(count__gt=1)
+    )
+    for row in duplicates:
+        keep_id = row['keep_id']
+        extra_ids = list(
+            Achievement.objects.filter(name=row['name'])
+            .exclude(id=keep_id)
+            .values_list('id', flat=True)
+        )
+        owners = UserAchievement.objects.filter(achievement_id=keep_id)
+        links = UserAchievement.objects.filter(achievement_id__in=extra_ids)
+        links.filter(user_id__in=owners.values('user_id')).delete()
+        for link in links.order_by('id'):
+            if owners.filter(user_id=link.user_id).exists():
+                link.delete()
+            else:
+                link.achievement_id = keep_id
+                link.save(update_fields=['achievement'])
+        Achievement.objects.filter(id__in=extra_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0014_user_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            merge_duplicate_achievements, migrations.RunPython.noop
+        ),
+        migrations.AlterField(
+            model_name='achievement',
+            name='name',
+            field=models.CharField(help_text='Введите достижение', max_length=255, unique=True, verbose_name='Достижение'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 3.2.25 on 2026-10-18 02:51
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def merge_duplicate_hardskills(apps, schema_editor):
+    """
+    Оставляет один навык на каждое название (с наименьшим id)
+    и переносит на него связи дубликатов с пользователями.
+    """
+    Hardskill = apps.get_model('users', 'Hardskill')
+    UserHardskill = apps.get_model('users', 'UserHardskill')
+    duplicates = (
+        Hardskill.objects.values('name')
+        .annotate(keep_id=Min('id'), count=Count('id'))
+        .filter(count__gt=1)
+    )
+    for row in duplicates:
+        keep_id = row['keep_id']
+        extra_ids = list(
+            Hardskill.objects.filter(name=row['name'])
+            .exclude(id=keep_id)
+            .values_list('id', flat=True)
+        )
+        owners = UserHardskill.objects.filter(hardskill_id=keep_id)
+        links = UserHardskill.objects.filter(hardskill_id__in=extra_ids)
+        for link in links.order_by('id'):
+            if owners.filter(user_id=link.user_id).exists():
+                link.delete()
+            else:
+                link.hardskill_id = keep_id
+                link.save(update_fields=['hardskill'])
+        Hardskill.objects.filter(id__in=extra_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0015_achievement_unique_name'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            merge_duplicate_hardskills, migrations.RunPython.noop
+        ),
+        migrations.AlterField(
+            model_name='hardskill',
+            name='name',
+            field=models.CharField(help_text='Введите профессиоанльный навык/хардскилл', max_length=255, unique=True, verbose_name='Хардскилл'),
+        ),
+    ]
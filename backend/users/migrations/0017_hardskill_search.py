@@ -0,0 +1,55 @@
+# Generated by Django 3.2.25 on 2026-10-18 02:53
+
+from django.db import migrations, models
+
+POSTGRESQL_FORWARDS = [
+    """
+    CREATE INDEX hardskill_name_upper_idx ON users_hardskill
+    (UPPER(name) varchar_pattern_ops)
+    """
+]
+POSTGRESQL_BACKWARDS = ['DROP INDEX IF EXISTS hardskill_name_upper_idx']
+
+SQLITE_FORWARDS = [
+    """
+    CREATE INDEX hardskill_name_nocase_idx ON users_hardskill
+    (name COLLATE NOCASE)
+    """
+]
+SQLITE_BACKWARDS = ['DROP INDEX IF EXISTS hardskill_name_nocase_idx']
+
+
+def run_vendor_sql(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0016_hardskill_unique_name'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userhardskill',
+            index=models.Index(fields=['hardskill', 'user'], name='user_hardskill_skill_idx'),
+        ),
+        migrations.RunPython(
+            run_vendor_sql(
+                {
+                    'postgresql': POSTGRESQL_FORWARDS,
+                    'sqlite': SQLITE_FORWARDS,
+                }
+            ),
+            run_vendor_sql(
+                {
+                    'postgresql': POSTGRESQL_BACKWARDS,
+                    'sqlite': SQLITE_BACKWARDS,
+                }
+            ),
+        ),
+    ]
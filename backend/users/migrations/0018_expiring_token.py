@@ -0,0 +1,27 @@
+# Generated by Django 3.2.25 on 2026-10-18 02:58
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authtoken', '0003_tokenproxy'),
+        ('users', '0017_hardskill_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExpiringToken',
+            fields=[
+            ],
+            options={
+                'verbose_name': 'Токен',
+                'verbose_name_plural': 'Токены',
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('authtoken.token',),
+        ),
+    ]
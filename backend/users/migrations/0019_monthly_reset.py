@@ -0,0 +1,59 @@
+# Generated by Django 3.2.25 on 2026-10-18 03:02
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0018_expiring_token'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyPointsArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField(verbose_name='Год')),
+                ('month', models.PositiveSmallIntegerField(verbose_name='Месяц')),
+                ('reward_points', models.IntegerField(verbose_name='Баллы за месяц')),
+                ('achievements_count', models.PositiveIntegerField(verbose_name='Достижений за месяц')),
+            ],
+            options={
+                'verbose_name': 'Итоги месяца',
+                'verbose_name_plural': 'Итоги месяцев',
+            },
+        ),
+        migrations.CreateModel(
+            name='MonthlyReset',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField(verbose_name='Год')),
+                ('month', models.PositiveSmallIntegerField(verbose_name='Месяц')),
+                ('stage', models.CharField(choices=[('points', 'Архивирование и обнуление баллов'), ('achievements', 'Удаление достижений'), ('done', 'Завершен')], default='points', max_length=12, verbose_name='Этап')),
+                ('last_user_id', models.PositiveBigIntegerField(default=0, verbose_name='Последний обработанный пользователь')),
+                ('achievement_bound', models.PositiveBigIntegerField(default=0, verbose_name='Последнее удаляемое достижение')),
+                ('started_at', models.DateTimeField(auto_now_add=True, verbose_name='Начало')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Окончание')),
+            ],
+            options={
+                'verbose_name': 'Ежемесячный сброс',
+                'verbose_name_plural': 'Ежемесячные сбросы',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='monthlyreset',
+            constraint=models.UniqueConstraint(fields=('year', 'month'), name='unique monthly reset'),
+        ),
+        migrations.AddField(
+            model_name='monthlypointsarchive',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_archive', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь'),
+        ),
+        migrations.AddConstraint(
+            model_name='monthlypointsarchive',
+            constraint=models.UniqueConstraint(fields=('user', 'year', 'month'), name='unique monthly archive for user'),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 3.2.25 on 2026-10-18 03:40
+
+from django.db import migrations, models
+
+POSTGRESQL_FORWARDS = ['DROP INDEX IF EXISTS hardskill_name_upper_idx']
+POSTGRESQL_BACKWARDS = [
+    """
+    CREATE INDEX hardskill_name_upper_idx ON users_hardskill
+    (UPPER(name) varchar_pattern_ops)
+    """
+]
+
+SQLITE_FORWARDS = ['DROP INDEX IF EXISTS hardskill_name_nocase_idx']
+SQLITE_BACKWARDS = [
+    """
+    CREATE INDEX hardskill_name_nocase_idx ON users_hardskill
+    (name COLLATE NOCASE)
+    """
+]
+
+
+def run_vendor_sql(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+
+    return run
+
+
+def fill_search_name(apps, schema_editor):
+    Hardskill = apps.get_model('users', 'Hardskill')
+    hardskills = list(Hardskill.objects.only('id', 'name'))
+    for hardskill in hardskills:
+        hardskill.search_name = hardskill.name.casefold()
+    Hardskill.objects.bulk_update(hardskills, ['search_name'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0019_monthly_reset'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_vendor_sql(
+                {
+                    'postgresql': POSTGRESQL_FORWARDS,
+                    'sqlite': SQLITE_FORWARDS,
+                }
+            ),
+            run_vendor_sql(
+                {
+                    'postgresql': POSTGRESQL_BACKWARDS,
+                    'sqlite': SQLITE_BACKWARDS,
+                }
+            ),
+        ),
+        migrations.AddField(
+            model_name='hardskill',
+            name='search_name',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=255),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_search_name, migrations.RunPython.noop),
+    ]
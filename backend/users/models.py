@@ -1,9 +1,17 @@
+from functools import reduce
+from operator import add, or_
+from time import sleep
+
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser, BaseUserManager
+from django.contrib.postgres.search import TrigramSimilarity
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import IntegrityError, models
-from django.db.models import UniqueConstraint
+from django.db import IntegrityError, connections, models
+from django.db.models import Case, Q, UniqueConstraint, Value, When
+from django.db.models.functions import Greatest
 from django.utils.timezone import now
 from rest_framework import serializers
+from rest_framework.authtoken.models import Token
 
 from backend.settings import MAX_LENGTH_EMAIL, MAX_LENGTH_USERNAME
 from department.models import Department
@@ -35,6 +43,12 @@ class Hardskill(models.Model):
         help_text='Введите профессиоанльный навык/хардскилл',
         max_length=MAX_LENGTH_USERNAME,
         blank=False,
+        unique=True,
+    )
+    # Название в casefold() для поиска без учета регистра: UPPER и
+    # NOCASE в SQLite не работают с кириллицей.
+    search_name = models.CharField(
+        max_length=MAX_LENGTH_USERNAME, db_index=True, editable=False
     )
 
     class Meta:
@@ -44,6 +58,13 @@ class Hardskill(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.search_name = self.name.casefold()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'name' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'search_name'}
+        super().save(*args, **kwargs)
+
 
 class Contact(models.Model):
     """
@@ -71,7 +92,53 @@ class Contact(models.Model):
         verbose_name_plural = 'Контакты'
 
 
-class CustomUserManager(BaseUserManager):
+SEARCH_FIELDS = ('email', 'first_name', 'last_name')
+
+
+class UserQuerySet(models.QuerySet):
+    def search(self, query):
+        """
+        Поиск пользователей по email, имени и фамилии: каждое слово запроса
+        должно найтись хотя бы в одном из полей.
+        Добавляет аннотацию search_rank: чем больше, тем релевантнее.
+        В PostgreSQL icontains использует GIN-индексы pg_trgm по UPPER(поле),
+        а search_rank - сходство триграмм. В SQLite слова ищутся по началу
+        полей через индексы COLLATE NOCASE.
+        """
+        words = query.split()
+        vendor = connections[self.db].vendor
+        lookup = 'icontains' if vendor == 'postgresql' else 'istartswith'
+        condition = Q()
+        for word in words:
+            condition &= reduce(
+                or_,
+                (Q(**{f'{field}__{lookup}': word}) for field in SEARCH_FIELDS),
+            )
+        if vendor == 'postgresql':
+            rank = Greatest(
+                *(TrigramSimilarity(field, query) for field in SEARCH_FIELDS)
+            )
+        else:
+            rank = reduce(
+                add,
+                (
+                    Case(
+                        When(Q(**{f'{field}__iexact': word}), then=Value(1.0)),
+                        default=Value(0.0),
+                        output_field=models.FloatField(),
+                    )
+                    for field in SEARCH_FIELDS
+                    for word in words
+                ),
+                Value(0.0),
+            )
+        return self.filter(condition).annotate(search_rank=rank)
+
+
+# mypy не проверяет базовые классы, созданные from_queryset().
+class CustomUserManager(
+    BaseUserManager.from_queryset(UserQuerySet)  # type: ignore[misc]
+):
     """
     Кастомная настройка создания пользователя.
     В случае создания обычного юзера по умолчанию
@@ -207,6 +274,18 @@ class User(AbstractUser):
         verbose_name = 'Пользователь'
         verbose_name_plural = 'Пользователи'
         ordering = ('-reward_points', 'email')
+        indexes = [
+            models.Index(
+                fields=('-reward_points', 'email'),
+                name='user_points_email_idx',
+                condition=Q(is_active=True),
+            ),
+            models.Index(
+                fields=('-reward_points_for_current_month', 'email'),
+                name='user_month_points_email_idx',
+                condition=Q(is_active=True),
+            ),
+        ]
 
     def __str__(self):
         return f'{self.first_name} {self.last_name}'
@@ -254,6 +333,13 @@ class UserHardskill(models.Model):
                 fields=('user', 'hardskill'), name='unique hardskill for user'
             )
         ]
+        # Поиск пользователей по навыку: индекс (user, hardskill) из
+        # ограничения уникальности для этого не подходит.
+        indexes = [
+            models.Index(
+                fields=('hardskill', 'user'), name='user_hardskill_skill_idx'
+            )
+        ]
 
         def __str__(self):
             return f'{self.user.first_name} - {self.hardskill}'
@@ -269,6 +355,7 @@ class Achievement(models.Model):
         help_text='Введите достижение',
         max_length=MAX_LENGTH_USERNAME,
         blank=False,
+        unique=True,
     )
     value = models.PositiveIntegerField(
         verbose_name='Ценность',
@@ -322,3 +409,159 @@ class UserAchievement(models.Model):
 
         def __str__(self):
             return f'{self.user.first_name} - {self.achievement}'
+
+
+class UserRank(models.Model):
+    """
+    Сохраненное место пользователя в общем рейтинге.
+    Заполняется только при включенной настройке USER_RANK_TABLE.
+    """
+
+    user = models.OneToOneField(
+        User,
+        verbose_name='Пользователь',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='cached_rank',
+    )
+    rank = models.PositiveIntegerField(verbose_name='Место', db_index=True)
+
+    class Meta:
+        verbose_name = 'Место в рейтинге'
+        verbose_name_plural = 'Места в рейтинге'
+
+
+class MonthlyPointsArchive(models.Model):
+    """
+    Итоги пользователя за месяц, сохраненные перед ежемесячным сбросом.
+    """
+
+    user = models.ForeignKey(
+        User,
+        verbose_name='Пользователь',
+        on_delete=models.CASCADE,
+        related_name='monthly_archive',
+    )
+    year = models.PositiveSmallIntegerField(verbose_name='Год')
+    month = models.PositiveSmallIntegerField(verbose_name='Месяц')
+    reward_points = models.IntegerField(verbose_name='Баллы за месяц')
+    achievements_count = models.PositiveIntegerField(
+        verbose_name='Достижений за месяц'
+    )
+
+    class Meta:
+        verbose_name = 'Итоги месяца'
+        verbose_name_plural = 'Итоги месяцев'
+        constraints = [
+            UniqueConstraint(
+                fields=('user', 'year', 'month'),
+                name='unique monthly archive for user',
+            )
+        ]
+
+
+class MonthlyReset(models.Model):
+    """
+    Контрольная точка ежемесячного сброса: прерванный сброс
+    продолжается с last_user_id.
+    """
+
+    POINTS = 'points'
+    ACHIEVEMENTS = 'achievements'
+    DONE = 'done'
+    STAGES = (
+        (POINTS, 'Архивирование и обнуление баллов'),
+        (ACHIEVEMENTS, 'Удаление достижений'),
+        (DONE, 'Завершен'),
+    )
+
+    year = models.PositiveSmallIntegerField(verbose_name='Год')
+    month = models.PositiveSmallIntegerField(verbose_name='Месяц')
+    stage = models.CharField(
+        verbose_name='Этап', max_length=12, choices=STAGES, default=POINTS
+    )
+    last_user_id = models.PositiveBigIntegerField(
+        verbose_name='Последний обработанный пользователь', default=0
+    )
+    achievement_bound = models.PositiveBigIntegerField(
+        verbose_name='Последнее удаляемое достижение', default=0
+    )
+    started_at = models.DateTimeField(verbose_name='Начало', auto_now_add=True)
+    finished_at = models.DateTimeField(
+        verbose_name='Окончание', null=True, blank=True
+    )
+
+    class Meta:
+        verbose_name = 'Ежемесячный сброс'
+        verbose_name_plural = 'Ежемесячные сбросы'
+        constraints = [
+            UniqueConstraint(
+                fields=('year', 'month'), name='unique monthly reset'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.year}-{self.month:02d}: {self.get_stage_display()}'
+
+
+def get_token_expiry_cutoff():
+    """Токены, созданные или продленные раньше этого момента, истекли."""
+    if not settings.TOKEN_LIFETIME:
+        return None
+    return now() - settings.TOKEN_LIFETIME
+
+
+class ExpiringTokenManager(models.Manager):
+    def get_or_create(self, defaults=None, **kwargs):
+        """
+        Вход через djoser получает токен через get_or_create: истекший
+        токен удаляется, чтобы пользователь получил новый.
+        """
+        cutoff = get_token_expiry_cutoff()
+        if cutoff is not None:
+            self.filter(created__lt=cutoff, **kwargs).delete()
+        return super().get_or_create(defaults, **kwargs)
+
+    def delete_expired(self, batch_size=1000, pause=0):
+        """
+        Удаляет истекшие токены пачками по batch_size, каждая пачка в
+        своей короткой транзакции. Индекса по created нет, поэтому
+        токены обходятся один раз по первичному ключу: каждая пачка
+        продолжает индекс с ключа, на котором остановилась предыдущая.
+        Возвращает число удаленных токенов.
+        """
+        cutoff = get_token_expiry_cutoff()
+        if cutoff is None:
+            return 0
+        deleted = 0
+        last_key = ''
+        while True:
+            keys = list(
+                self.filter(key__gt=last_key, created__lt=cutoff)
+                .order_by('key')
+                .values_list('key', flat=True)[:batch_size]
+            )
+            if not keys:
+                return deleted
+            # Токен могли продлить между выборкой и удалением.
+            count, _ = self.filter(key__in=keys, created__lt=cutoff).delete()
+            deleted += count
+            if len(keys) < batch_size:
+                return deleted
+            last_key = keys[-1]
+            if pause:
+                sleep(pause)
+
+
+class ExpiringToken(Token):
+    """
+    Токен авторизации со сроком действия TOKEN_LIFETIME. Поле created
+    хранит время последнего продления.
+    """
+
+    objects = ExpiringTokenManager()
+
+    class Meta:
+        proxy = True
+        verbose_name = 'Токен'
+        verbose_name_plural = 'Токены'
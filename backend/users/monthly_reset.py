@@ -0,0 +1,128 @@
+from collections import Counter
+from time import sleep
+
+from dateutil.relativedelta import relativedelta  # type: ignore
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from users.models import (
+    MonthlyPointsArchive,
+    MonthlyReset,
+    User,
+    UserAchievement,
+)
+
+
+def get_previous_month():
+    """Первое число прошлого месяца: сброс 1-го числа подводит его итоги."""
+    return timezone.localdate().replace(day=1) - relativedelta(months=1)
+
+
+def reset_month(year, month, chunk_size=1000, pause=0):
+    """
+    Ежемесячный сброс: итоги пользователей за месяц сохраняются в
+    MonthlyPointsArchive, баллы за месяц обнуляются, достижения
+    удаляются. Пользователи обрабатываются пачками по первичному ключу,
+    каждая пачка в своей транзакции вместе с контрольной точкой,
+    поэтому прерванный сброс продолжается с места остановки, а
+    завершенный второй раз не выполняется.
+    Возвращает счетчики этого запуска.
+    """
+    checkpoint, _ = MonthlyReset.objects.get_or_create(
+        year=year,
+        month=month,
+        defaults={
+            'achievement_bound': (
+                UserAchievement.objects.aggregate(bound=Max('id'))['bound']
+                or 0
+            )
+        },
+    )
+    counts = Counter()
+    if checkpoint.stage == MonthlyReset.POINTS:
+        # bulk_create(ignore_conflicts=True) не сообщает, сколько строк
+        # вставлено, поэтому число итогов в архиве считается запросом.
+        archive = MonthlyPointsArchive.objects.filter(year=year, month=month)
+        archived_before = archive.count()
+        while reset_points_chunk(checkpoint, chunk_size, counts):
+            if pause:
+                sleep(pause)
+        counts['archived'] = archive.count() - archived_before
+        checkpoint.stage = MonthlyReset.ACHIEVEMENTS
+        checkpoint.save(update_fields=['stage'])
+    if checkpoint.stage == MonthlyReset.ACHIEVEMENTS:
+        while delete_achievements_chunk(checkpoint, chunk_size, counts):
+            if pause:
+                sleep(pause)
+        checkpoint.stage = MonthlyReset.DONE
+        checkpoint.finished_at = timezone.now()
+        checkpoint.save(update_fields=['stage', 'finished_at'])
+    return counts
+
+
+def reset_points_chunk(checkpoint, chunk_size, counts):
+    """
+    Архивирует и обнуляет баллы следующей пачки пользователей.
+    Возвращает False, когда пользователи закончились.
+    """
+    with transaction.atomic():
+        ids = list(
+            User.objects.select_for_update()
+            .filter(id__gt=checkpoint.last_user_id)
+            .order_by('id')
+            .values_list('id', flat=True)[:chunk_size]
+        )
+        if not ids:
+            return False
+        achievements = dict(
+            UserAchievement.objects.filter(
+                user__in=ids, id__lte=checkpoint.achievement_bound
+            )
+            .order_by()
+            .values('user')
+            .annotate(count=Count('id'))
+            .values_list('user', 'count')
+        )
+        points = dict(
+            User.objects.filter(id__in=ids)
+            .exclude(reward_points_for_current_month=0)
+            .values_list('id', 'reward_points_for_current_month')
+        )
+        MonthlyPointsArchive.objects.bulk_create(
+            [
+                MonthlyPointsArchive(
+                    user_id=user_id,
+                    year=checkpoint.year,
+                    month=checkpoint.month,
+                    reward_points=points.get(user_id, 0),
+                    achievements_count=achievements.get(user_id, 0),
+                )
+                for user_id in ids
+                if user_id in points or user_id in achievements
+            ],
+            ignore_conflicts=True,
+        )
+        counts['users'] += User.objects.filter(id__in=points).update(
+            reward_points_for_current_month=0
+        )
+        checkpoint.last_user_id = ids[-1]
+        checkpoint.save(update_fields=['last_user_id'])
+    return True
+
+
+def delete_achievements_chunk(checkpoint, chunk_size, counts):
+    """
+    Удаляет следующую пачку достижений, выданных до начала сброса.
+    Возвращает False, когда удалять больше нечего.
+    """
+    ids = list(
+        UserAchievement.objects.filter(id__lte=checkpoint.achievement_bound)
+        .order_by('id')
+        .values_list('id', flat=True)[:chunk_size]
+    )
+    if not ids:
+        return False
+    deleted, _ = UserAchievement.objects.filter(id__in=ids).delete()
+    counts['achievements'] += deleted
+    return True
@@ -0,0 +1,79 @@
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+
+from users.models import User, UserRank
+
+RANK_ORDERING = ('-reward_points', 'email')
+LEADERBOARD_FIELDS = {
+    'all': 'reward_points',
+    'month': 'reward_points_for_current_month',
+}
+# Ключ pg_advisory_xact_lock для пересчета таблицы мест.
+REFRESH_LOCK_ID = 4101
+
+
+def get_rating(user):
+    """
+    Место пользователя в общем рейтинге: число активных пользователей
+    с большим количеством баллов (при равенстве — с меньшим email) плюс 1.
+    Таблицу мест пересчитывает планировщик, до пересчета место
+    нового пользователя считается запросом.
+    """
+    if settings.USER_RANK_TABLE:
+        rank = (
+            UserRank.objects.filter(user=user)
+            .values_list('rank', flat=True)
+            .first()
+        )
+        if rank is not None:
+            return rank
+    ahead = User.objects.filter(is_active=True).filter(
+        Q(reward_points__gt=user.reward_points)
+        | Q(reward_points=user.reward_points, email__lt=user.email)
+    )
+    return ahead.count() + 1
+
+
+def get_leaderboard(period, department=None):
+    """
+    Активные пользователи для рейтинга за период и поле сортировки.
+    Места считает RankedKeysetPagination.
+    """
+    queryset = User.objects.filter(is_active=True)
+    if department:
+        queryset = queryset.filter(department__name=department)
+    return queryset, (f'-{LEADERBOARD_FIELDS[period]}', 'email')
+
+
+def refresh_ranks():
+    """
+    Пересчитывает таблицу мест целиком. Пересчеты выполняются по одному:
+    в PostgreSQL под advisory-блокировкой, SQLite и так пропускает
+    только одну пишущую транзакцию. Возвращает число мест.
+    """
+    with transaction.atomic():
+        lock_refresh()
+        user_ids = (
+            User.objects.filter(is_active=True)
+            .order_by(*RANK_ORDERING)
+            .values_list('id', flat=True)
+        )
+        UserRank.objects.all().delete()
+        ranks = UserRank.objects.bulk_create(
+            (
+                UserRank(user_id=user_id, rank=rank)
+                for rank, user_id in enumerate(user_ids.iterator(), start=1)
+            ),
+            batch_size=1000,
+        )
+    return len(ranks)
+
+
+def lock_refresh():
+    """Блокировка пересчета мест до конца текущей транзакции."""
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT pg_advisory_xact_lock(%s)', [REFRESH_LOCK_ID]
+            )
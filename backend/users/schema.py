@@ -1,6 +1,12 @@
-from drf_spectacular.utils import extend_schema
+from drf_spectacular.utils import OpenApiParameter, extend_schema
 
-from users.serializers import UploadUserImageSerializer
+from users.serializers import (
+    HardskillAutocompleteParamsSerializer,
+    LeaderboardParamsSerializer,
+    ProgressParamsSerializer,
+    SkillSearchParamsSerializer,
+    UploadUserImageSerializer,
+)
 
 
 class SCHEMA:
@@ -10,8 +16,26 @@ class SCHEMA:
             description=(
                 'Фильтрация по роли (role), по должности (position), по '
                 'подразделению (department).\n\nПоиск по email, по имени '
-                '(first_name), по фамилии (last_name)'
+                '(first_name), по фамилии (last_name)\n\nПостраничный '
+                'вывод по курсору. По умолчанию без навыков, достижений, '
+                'контактов и вычисляемых полей, нужные поля перечисляются '
+                'в параметре fields.'
             ),
+            parameters=[
+                OpenApiParameter(
+                    'fields',
+                    str,
+                    description='Поля через запятую, например id,email.',
+                ),
+                OpenApiParameter(
+                    'q',
+                    str,
+                    description=(
+                        'Поиск по email, имени и фамилии. Результаты '
+                        'отсортированы по релевантности.'
+                    ),
+                ),
+            ],
         ),
         'create': extend_schema(summary='Создание нового пользователя.'),
         'retrieve': extend_schema(summary='Получение пользователя по id.'),
@@ -54,16 +78,64 @@ class SCHEMA:
                 'месяц.'
             ),
             description=(
-                'Значение в процентах от всех выполненных задач за ' 'месяц.'
+                'Значение в процентах от всех выполненных задач за '
+                'месяц. Прошлые месяцы запрашиваются параметром month.'
             ),
+            parameters=[ProgressParamsSerializer],
         ),
         'add_achievements': extend_schema(
-            summary='Добавление достижений в профиль пользователя.'
+            summary='Добавление достижений в профиль пользователя.',
+            description=(
+                'Достижения ищутся по названию, отсутствующие создаются. '
+                'Баллы начисляются только за впервые выданные достижения. '
+                'В ответе для пользователя списки granted и '
+                'already_granted.'
+            ),
+        ),
+        'by_skills': extend_schema(
+            summary='Поиск пользователей по навыкам.',
+            description=(
+                'Пользователи, у которых есть все навыки из all (через '
+                'запятую, без учета регистра). Поля и постраничный вывод '
+                'как у списка пользователей.'
+            ),
+            parameters=[SkillSearchParamsSerializer],
+        ),
+        'add_achievements_bulk': extend_schema(
+            summary='Выдача достижений нескольким пользователям.',
+            description=(
+                'Те же достижения выдаются всем пользователям из users '
+                '(не более 500). В ответе результат по каждому пользователю.'
+            ),
         ),
     }
-    short_user_profile = {
+    short_user_profile: dict = {
         'summary': 'Получение информации пользователя для хедера.'
     }
+    leaderboard: dict = {
+        'summary': 'Рейтинг пользователей по баллам.',
+        'description': (
+            'period=all — по всем баллам, period=month — по баллам за '
+            'текущий месяц. Пользователи с равными баллами делят место. '
+            'Постраничный вывод по курсору, только вперед.'
+        ),
+        'parameters': [LeaderboardParamsSerializer],
+    }
+    hardskills: dict = {
+        'summary': 'Подсказки навыков по началу названия.',
+        'description': (
+            'Не больше 10 навыков в алфавитном порядке с числом '
+            'пользователей, у которых есть навык.'
+        ),
+        'parameters': [HardskillAutocompleteParamsSerializer],
+    }
+    token_cache_stats: dict = {
+        'summary': 'Статистика кэша токенов.',
+        'description': (
+            'Попадания и промахи кэша токенов в процессе, который '
+            'обработал запрос. Доступно администратору.'
+        ),
+    }
 
 
 user_schema = SCHEMA()
@@ -1,17 +1,24 @@
 from datetime import date
 
-from core.utils import how_much_time_has_passed
-from dateutil.relativedelta import relativedelta  # type: ignore
+from core.utils import how_much_time_has_passed_many
 from django.contrib.auth.password_validation import validate_password
 from django.core import exceptions as django_exceptions
+from django.db import models
+from django.db.models import Sum
 from djoser.serializers import UserCreateSerializer, UserSerializer
 from drf_base64.fields import Base64ImageField
 from rest_framework import serializers
 from rest_framework.settings import api_settings
 
-from tasks.models import Task
+from backend.settings import MAX_LENGTH_USERNAME
+from department.models import Department
+from tasks.models import TaskMonthlyStats
+from users import achievements as achievement_service
+from users import hardskills, ranking
 from users.models import Achievement, Contact, Hardskill, User
 
+MAX_SEARCH_SKILLS = 20
+
 
 class ContactSerializer(serializers.ModelSerializer):
     def validate_phone(self, value):
@@ -46,10 +53,45 @@ class AchievementSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
+class ProfileAchievementSerializer(AchievementSerializer):
+    """
+    Достижение в профиле пользователя: существующее название допустимо,
+    достижение ищется по нему при обновлении профиля.
+    """
+
+    class Meta(AchievementSerializer.Meta):
+        extra_kwargs: dict = {'name': {'validators': []}}
+
+
 class HardskillsSerializer(serializers.ModelSerializer):
     class Meta:
         model = Hardskill
         fields = ('name',)
+        extra_kwargs: dict = {'name': {'validators': []}}
+
+
+class AchievementGrantItemSerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=MAX_LENGTH_USERNAME)
+    value = serializers.IntegerField(min_value=1, max_value=100, default=1)
+    description = serializers.CharField(
+        max_length=MAX_LENGTH_USERNAME, allow_blank=True, default=''
+    )
+    image = Base64ImageField(required=False)
+
+
+class AchievementGrantSerializer(serializers.Serializer):
+    """
+    Выдача достижений. Достижение ищется по названию и создается, если
+    его еще нет; value и description используются только при создании.
+    """
+
+    achievements = AchievementGrantItemSerializer(many=True, allow_empty=False)
+
+
+class AchievementBulkGrantSerializer(AchievementGrantSerializer):
+    users = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False, max_length=500
+    )
 
 
 class UploadUserImageSerializer(serializers.ModelSerializer):
@@ -65,9 +107,63 @@ class ProgressSerializer(serializers.Serializer):
     department_progress = serializers.IntegerField()
 
 
+class ProgressParamsSerializer(serializers.Serializer):
+    month = serializers.DateField(
+        input_formats=['%Y-%m'],
+        required=False,
+        help_text='Месяц в формате YYYY-MM, по умолчанию текущий.',
+    )
+
+
+EXPERIENCE_FIELDS = ('experience', 'general_experience')
+
+
+def format_experience(users, field):
+    """
+    Строки стажа для списка пользователей. Значения, посчитанные заранее
+    в ExperienceListSerializer, берутся из user._experience.
+    """
+    result = [None] * len(users)
+    pending = []
+    for index, user in enumerate(users):
+        cached = getattr(user, '_experience', {})
+        if field in cached:
+            result[index] = cached[field]
+        elif getattr(user, field):
+            pending.append(index)
+        else:
+            result[index] = 'Нет данных'
+    formatted = how_much_time_has_passed_many(
+        [getattr(users[index], field) for index in pending]
+    )
+    for index, value in zip(pending, formatted):
+        result[index] = value
+    return result
+
+
+class ExperienceListSerializer(serializers.ListSerializer):
+    """
+    Форматирует стаж всех пользователей списка одним проходом
+    до сериализации отдельных объектов.
+    """
+
+    def to_representation(self, data):
+        if isinstance(data, models.Manager):
+            data = data.all()
+        users = list(data)
+        for user in users:
+            user._experience = {}
+        for field in EXPERIENCE_FIELDS:
+            if field not in self.child.fields:
+                continue
+            for user, value in zip(users, format_experience(users, field)):
+                user._experience[field] = value
+        return super().to_representation(users)
+
+
 class CustomUserRetrieveSerializer(UserSerializer):
     hardskills = HardskillsSerializer(many=True, required=False)
-    achievements = AchievementSerializer(many=True, required=False)
+    achievements = ProfileAchievementSerializer(many=True, required=False)
     achievements_read_only = serializers.BooleanField(
         read_only=True, default=False
     )
@@ -82,7 +178,7 @@ class CustomUserRetrieveSerializer(UserSerializer):
 
     class Meta:
         model = User
-        fields = (
+        fields: tuple = (
             'id',
             'first_name',
             'last_name',
@@ -102,80 +198,121 @@ class CustomUserRetrieveSerializer(UserSerializer):
             'experience',
             'general_experience',
         )
+        list_serializer_class = ExperienceListSerializer
+
+    def get_monthly_tasks_count(self, obj):
+        """
+        Задачи пользователя за текущий месяц. В списке значение приходит
+        аннотацией monthly_tasks_count из CustomDjUserViewSet.get_queryset.
+        """
+        if not hasattr(obj, 'monthly_tasks_count'):
+            today = date.today()
+            obj.monthly_tasks_count = (
+                TaskMonthlyStats.objects.filter(
+                    user=obj, year=today.year, month=today.month
+                ).aggregate(created=Sum('created'))['created']
+                or 0
+            )
+        return obj.monthly_tasks_count
 
     def get_total_tasks(self, instance):
-        today = date.today()
-        start_of_month = today.replace(day=1)
-        end_of_month = today + relativedelta(day=31)
-        total_tasks = Task.objects.filter(
-            assigned_to=instance,
-            created_at__gte=start_of_month,
-            created_at__lte=end_of_month,
-        ).count()
-        return total_tasks
+        return self.get_monthly_tasks_count(instance)
 
     def get_remaining_tasks_count(self, obj):
-        today = date.today()
-        start_of_month = today.replace(day=1)
-        end_of_month = today + relativedelta(day=31)
-
-        total_tasks = Task.objects.filter(
-            assigned_to=obj,
-            created_at__gte=start_of_month,
-            created_at__lte=end_of_month,
-        ).count()
-
-        return total_tasks - obj.completed_tasks_count
+        return self.get_monthly_tasks_count(obj) - obj.completed_tasks_count
 
     def update(self, instance, validated_data):
-        hardskills_data = validated_data.pop('hardskills', [])
-        achievements_data = validated_data.pop('achievements', [])
-        contacts_data = validated_data.pop('contacts', [])
+        hardskills_data = validated_data.pop('hardskills', None)
+        achievements_data = validated_data.pop('achievements', None)
+        contacts_data = validated_data.pop('contacts', None)
         is_teamleader = self.context['request'].user.is_teamleader
         is_user_self = instance == self.context['request'].user
 
-        if is_teamleader:
-            instance.achievements.clear()
-            for achievement_data in achievements_data:
-                achievement, created = Achievement.objects.get_or_create(
-                    name=achievement_data['name'],
-                    defaults={
-                        'description': achievement_data.get('description', '')
-                    },
-                )
-                instance.achievements.add(achievement)
+        if is_teamleader and achievements_data is not None:
+            achievements = achievement_service.get_or_create_achievements(
+                achievements_data
+            )
+            self.sync_relation(
+                instance.achievements,
+                [achievements[item['name']] for item in achievements_data],
+            )
 
         if is_user_self:
-            instance.hardskills.clear()
-            for hardskill_data in hardskills_data:
-                hardskill, created = Hardskill.objects.get_or_create(
-                    name=hardskill_data['name']
+            if hardskills_data is not None:
+                self.sync_relation(
+                    instance.hardskills,
+                    hardskills.get_or_create_hardskills(
+                        item['name'] for item in hardskills_data
+                    ),
                 )
-                instance.hardskills.add(hardskill)
 
-            try:
-                contact = Contact.objects.get(user=instance)
-                for key, value in contacts_data.items():
-                    setattr(contact, key, value)
-                contact.save()
-            except Contact.DoesNotExist:
-                contacts_data['user'] = instance
-                Contact.objects.create(**contacts_data)
+            if contacts_data is not None:
+                try:
+                    contact = instance.contacts
+                    for key, value in contacts_data.items():
+                        setattr(contact, key, value)
+                    contact.save()
+                except Contact.DoesNotExist:
+                    contacts_data['user'] = instance
+                    instance.contacts = Contact.objects.create(**contacts_data)
 
         instance = super().update(instance, validated_data)
         return instance
 
+    @staticmethod
+    def sync_relation(manager, objects):
+        """
+        Приводит связи many-to-many к objects: удаляются и добавляются
+        только изменившиеся строки промежуточной таблицы.
+        """
+        wanted = {obj.pk for obj in objects}
+        current = set(manager.values_list('pk', flat=True))
+        if current - wanted:
+            manager.remove(*(current - wanted))
+        if wanted - current:
+            manager.add(*(wanted - current))
+
     def get_experience(self, obj):
-        dt = obj.experience
-        if dt:
-            return how_much_time_has_passed(dt)
-        return 'Нет данных'
+        return format_experience([obj], 'experience')[0]
 
     def get_general_experience(self, obj):
-        dt = obj.general_experience
-        if dt:
-            return how_much_time_has_passed(dt)
-        return 'Нет данных'
+        return format_experience([obj], 'general_experience')[0]
+
+
+class UserListSerializer(CustomUserRetrieveSerializer):
+    """
+    [GET] Список пользователей.
+    По умолчанию без вложенных связей и вычисляемых полей, набор полей
+    задается параметром ?fields= и передается в context['fields'].
+    """
+
+    DEFAULT_FIELDS = (
+        'id',
+        'first_name',
+        'last_name',
+        'email',
+        'image',
+        'role',
+        'position',
+        'department',
+        'reward_points',
+        'reward_points_for_current_month',
+        'completed_tasks_count',
+    )
+
+    department = serializers.StringRelatedField()
+
+    class Meta(CustomUserRetrieveSerializer.Meta):
+        fields = CustomUserRetrieveSerializer.Meta.fields + (
+            'image',
+            'department',
+        )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = self.context.get('fields') or self.DEFAULT_FIELDS
+        for name in set(self.fields) - set(requested):
+            self.fields.pop(name)
 
 
 class CustomUserCreateSerializer(UserCreateSerializer):
@@ -247,12 +384,71 @@ class ShortUserProfileSerializer(serializers.ModelSerializer):
         )
 
     def get_rating(self, obj):
-        users = User.objects.filter(is_active=True).order_by(
-            '-reward_points', 'email'
-        )
-        user_ids = [user.id for user in users]
-        rating = user_ids.index(obj.id) + 1
-        return rating
+        return ranking.get_rating(obj)
 
     def get_department(self, obj):
         return str(self.context['request'].user.department)
+
+
+class LeaderboardSerializer(serializers.ModelSerializer):
+    rank = serializers.IntegerField()
+
+    class Meta:
+        model = User
+        fields = (
+            'rank',
+            'id',
+            'first_name',
+            'last_name',
+            'image',
+            'reward_points',
+            'reward_points_for_current_month',
+        )
+
+
+class LeaderboardParamsSerializer(serializers.Serializer):
+    period = serializers.ChoiceField(
+        choices=list(ranking.LEADERBOARD_FIELDS), default='all'
+    )
+    department = serializers.ChoiceField(
+        choices=Department.DEPARTMENT_NAMES, required=False
+    )
+
+
+class SkillSearchParamsSerializer(serializers.Serializer):
+    all = serializers.CharField(
+        help_text='Навыки через запятую, нужны все из них.'
+    )
+    department = serializers.ChoiceField(
+        choices=Department.DEPARTMENT_NAMES, required=False
+    )
+
+    def validate_all(self, value):
+        names = hardskills.parse_skill_names(value)
+        if not names:
+            raise serializers.ValidationError('Укажите хотя бы один навык.')
+        if len(names) > MAX_SEARCH_SKILLS:
+            raise serializers.ValidationError(
+                f'Не больше {MAX_SEARCH_SKILLS} навыков.'
+            )
+        return names
+
+
+class HardskillAutocompleteParamsSerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=MAX_LENGTH_USERNAME)
+
+
+class HardskillAutocompleteSerializer(serializers.ModelSerializer):
+    users_count = serializers.IntegerField()
+
+    class Meta:
+        model = Hardskill
+        fields = ('id', 'name', 'users_count')
+
+
+class TokenCacheStatsSerializer(serializers.Serializer):
+    hits = serializers.IntegerField()
+    misses = serializers.IntegerField()
+    size = serializers.IntegerField()
+    maxsize = serializers.IntegerField()
+    ttl = serializers.IntegerField()
@@ -0,0 +1,46 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from users import hardskills
+from users.authentication import token_cache
+from users.models import ExpiringToken, User, UserHardskill
+
+
+@receiver(m2m_changed, sender=User.hardskills.through)
+def invalidate_hardskill_usage(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    """
+    Сбрасывает кэш числа пользователей у добавленных навыков.
+    Удаление связей отправляет post_delete для UserHardskill.
+    """
+    if action != 'post_add':
+        return
+    hardskills.invalidate_usage_counts({instance.pk} if reverse else pk_set)
+
+
+@receiver(post_delete, sender=UserHardskill)
+def invalidate_hardskill_usage_on_delete(sender, instance, **kwargs):
+    hardskills.invalidate_usage_counts([instance.hardskill_id])
+
+
+@receiver(post_save, sender=User)
+def invalidate_token_cache_on_save(sender, instance, created, **kwargs):
+    """
+    Сохранение пользователя сбрасывает его токены в кэше: так
+    деактивация и смена роли действуют со следующего запроса.
+    """
+    if not created:
+        token_cache.invalidate_user(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def invalidate_token_cache_on_delete(sender, instance, **kwargs):
+    token_cache.invalidate_user(instance.pk)
+
+
+@receiver(post_delete, sender=Token)
+@receiver(post_delete, sender=ExpiringToken)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    token_cache.invalidate(instance.key)
@@ -0,0 +1,213 @@
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from users.authentication import TokenCache, token_cache
+from users.models import ExpiringToken, User, UserRole
+
+
+class CachedTokenAuthenticationTest(TestCase):
+    """
+    Тестирование кэша токенов и его сброса сигналами.
+    """
+
+    url = '/api/curent_user_info/'
+
+    def setUp(self):
+        token_cache.clear()
+        self.user = User.objects.create(
+            email='user@mail.ru',
+            first_name='User',
+            last_name='Userov',
+            password='password',
+            is_active=True,
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_token_cached(self):
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        # Только запросы самого эндпоинта, без Token JOIN User.
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(token_cache.stats()['hits'], 1)
+        self.assertEqual(token_cache.stats()['misses'], 1)
+
+    def test_deactivated_user_rejected(self):
+        self.client.get(self.url)
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_role_change_applied(self):
+        self.client.get(self.url)
+        self.user.role = UserRole.TEAMLEADER
+        self.user.save(update_fields=['role'])
+        response = self.client.get('/api/users/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_me_reads_points_from_db(self):
+        self.client.get('/api/users/me/')
+        User.objects.filter(pk=self.user.pk).update(
+            reward_points=F('reward_points') + 10
+        )
+        response = self.client.get('/api/users/me/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['reward_points'], 10)
+        self.assertEqual(token_cache.stats()['hits'], 1)
+
+    def test_deleted_token_rejected(self):
+        self.client.get(self.url)
+        Token.objects.filter(user=self.user).delete()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_stats_for_admin(self):
+        self.client.get(self.url)
+        self.assertEqual(
+            self.client.get('/api/token_cache_stats/').status_code,
+            status.HTTP_403_FORBIDDEN,
+        )
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get('/api/token_cache_stats/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['size'], 1)
+
+
+class TokenExpiryTest(TestCase):
+    """
+    Тестирование срока действия токенов и их очистки.
+    """
+
+    url = '/api/curent_user_info/'
+
+    def setUp(self):
+        token_cache.clear()
+        self.user = User.objects.create(
+            email='user@mail.ru',
+            first_name='User',
+            last_name='Userov',
+            is_active=True,
+        )
+        self.user.set_password('password')
+        self.user.save()
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def age_token(self, age, key=None):
+        Token.objects.filter(key=key or self.token.key).update(
+            created=timezone.now() - age
+        )
+
+    def test_expired_token_rejected(self):
+        self.age_token(settings.TOKEN_LIFETIME + timedelta(minutes=1))
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_token_refreshed_once_per_interval(self):
+        self.age_token(settings.TOKEN_REFRESH_INTERVAL + timedelta(minutes=1))
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.token.refresh_from_db()
+        refreshed = self.token.created
+        self.assertGreater(
+            refreshed, timezone.now() - settings.TOKEN_REFRESH_INTERVAL
+        )
+        token_cache.clear()
+        self.client.get(self.url)
+        self.token.refresh_from_db()
+        self.assertEqual(self.token.created, refreshed)
+
+    def test_login_replaces_expired_token(self):
+        self.age_token(settings.TOKEN_LIFETIME + timedelta(minutes=1))
+        response = APIClient().post(
+            '/api/token/login/',
+            {'email': 'user@mail.ru', 'password': 'password'},
+            format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.data['auth_token'], self.token.key)
+
+    def test_clear_expired_tokens(self):
+        users = [
+            User.objects.create(email=f'user{number}@mail.ru')
+            for number in range(3)
+        ]
+        for user in users:
+            self.age_token(
+                settings.TOKEN_LIFETIME + timedelta(days=1),
+                Token.objects.create(user=user).key,
+            )
+        out = StringIO()
+        call_command('clear_expired_tokens', batch_size=2, pause=0, stdout=out)
+        self.assertIn('Удалено истекших токенов: 3', out.getvalue())
+        self.assertEqual(
+            list(ExpiringToken.objects.values_list('key', flat=True)),
+            [self.token.key],
+        )
+
+    def test_expired_tokens_walked_by_key(self):
+        keys = []
+        for number in range(3):
+            key = Token.objects.create(
+                user=User.objects.create(email=f'user{number}@mail.ru')
+            ).key
+            self.age_token(settings.TOKEN_LIFETIME + timedelta(days=1), key)
+            keys.append(key)
+        with CaptureQueriesContext(connection) as queries:
+            deleted = ExpiringToken.objects.delete_expired(batch_size=2)
+        self.assertEqual(deleted, 3)
+        selects = [
+            query['sql']
+            for query in queries.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'ORDER BY "authtoken_token"."key"' in query['sql']
+        ]
+        self.assertEqual(len(selects), 2)
+        self.assertIn(f'"key" > \'{sorted(keys)[1]}\'', selects[1])
+
+
+class TokenCacheTest(TestCase):
+    def setUp(self):
+        self.users = [User(id=number) for number in range(3)]
+
+    def test_lru_eviction(self):
+        cache = TokenCache(maxsize=2, ttl=60)
+        cache.set('a', self.users[0], None)
+        cache.set('b', self.users[1], None)
+        cache.get('a')
+        cache.set('c', self.users[2], None)
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNotNone(cache.get('c'))
+
+    def test_expired_entry(self):
+        cache = TokenCache(maxsize=2, ttl=60)
+        with patch('users.authentication.monotonic', return_value=0):
+            cache.set('a', self.users[0], None)
+        with patch('users.authentication.monotonic', return_value=61):
+            self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.stats()['size'], 0)
+
+    def test_invalidate_user(self):
+        cache = TokenCache(maxsize=10, ttl=60)
+        cache.set('a', self.users[0], None)
+        cache.set('b', self.users[0], None)
+        cache.set('c', self.users[1], None)
+        cache.invalidate_user(self.users[0].pk)
+        self.assertEqual(cache.stats()['size'], 1)
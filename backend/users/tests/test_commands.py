@@ -0,0 +1,171 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from tasks.models import Task
+from users.achievements import NO_DELAY_ACHIEVEMENT, get_month_bounds
+from users.models import (
+    Achievement,
+    MonthlyPointsArchive,
+    MonthlyReset,
+    User,
+    UserAchievement,
+)
+
+
+class AchievementForNoDelayCommandTest(TestCase):
+    """
+    Тестирование выдачи достижения за соблюдение дедлайнов.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.achievement = Achievement.objects.create(
+            name=NO_DELAY_ACHIEVEMENT, value=10
+        )
+        cls.users = [
+            User.objects.create(
+                email=f'user{number}@mail.ru',
+                first_name='User',
+                last_name='Userov',
+                password='password',
+                is_active=True,
+            )
+            for number in range(3)
+        ]
+        start, end = get_month_bounds(timezone.localdate())
+        tasks = (
+            (cls.users[0], start + timedelta(hours=1), False),
+            (cls.users[0], end - timedelta(hours=1), False),
+            (cls.users[1], start + timedelta(hours=1), False),
+            (cls.users[1], start + timedelta(hours=2), True),
+            (cls.users[2], end + timedelta(hours=1), False),
+        )
+        for user, deadline, is_overdue in tasks:
+            Task.objects.create(
+                title='Задача',
+                description='Описание',
+                deadline=deadline,
+                reward_points=10,
+                team_leader=user,
+                assigned_to=user,
+                is_overdue=is_overdue,
+            )
+
+    def run_command(self, *args):
+        out = StringIO()
+        call_command('achievement_for_no_delay', *args, stdout=out)
+        return out.getvalue()
+
+    def test_awarded_once(self):
+        output = self.run_command()
+        self.assertIn('выдано: 1', output)
+        self.assertEqual(
+            list(UserAchievement.objects.values_list('user', flat=True)),
+            [self.users[0].id],
+        )
+        output = self.run_command()
+        self.assertIn('выдано: 0', output)
+        self.users[0].refresh_from_db()
+        self.assertEqual(self.users[0].reward_points, 10)
+        self.assertEqual(self.users[0].reward_points_for_current_month, 10)
+
+    def test_dry_run(self):
+        output = self.run_command('--dry-run')
+        self.assertIn('Подходят пользователей: 1', output)
+        self.assertIn('будет выдано: 1', output)
+        self.assertFalse(UserAchievement.objects.exists())
+
+
+class ResetMonthlyRewardPointsCommandTest(TestCase):
+    """
+    Тестирование ежемесячного сброса баллов и достижений.
+    """
+
+    def setUp(self):
+        achievement = Achievement.objects.create(name='Наставник', value=5)
+        self.users = []
+        for number, points in enumerate((30, 0, 20)):
+            user = User.objects.create(
+                email=f'user{number}@mail.ru',
+                first_name='User',
+                last_name='Userov',
+                password='password',
+                reward_points=100,
+                reward_points_for_current_month=points,
+                is_active=True,
+            )
+            self.users.append(user)
+        UserAchievement.objects.create(
+            user=self.users[0], achievement=achievement
+        )
+        UserAchievement.objects.create(
+            user=self.users[1], achievement=achievement
+        )
+
+    def run_command(self):
+        out = StringIO()
+        call_command(
+            'reset_monthly_reward_points',
+            '--month=2026-09',
+            '--chunk-size=1',
+            '--pause=0',
+            stdout=out,
+        )
+        return out.getvalue()
+
+    def test_reset_archives_and_clears(self):
+        output = self.run_command()
+        self.assertIn('обнулены баллы у 2 пользователей', output)
+        self.assertIn('в архиве 3 итогов', output)
+        self.assertEqual(
+            set(
+                MonthlyPointsArchive.objects.filter(
+                    year=2026, month=9
+                ).values_list('user', 'reward_points', 'achievements_count')
+            ),
+            {
+                (self.users[0].id, 30, 1),
+                (self.users[1].id, 0, 1),
+                (self.users[2].id, 20, 0),
+            },
+        )
+        self.assertFalse(UserAchievement.objects.exists())
+        self.assertFalse(
+            User.objects.exclude(reward_points_for_current_month=0).exists()
+        )
+        self.assertFalse(User.objects.exclude(reward_points=100).exists())
+
+        output = self.run_command()
+        self.assertIn('обнулены баллы у 0 пользователей', output)
+        self.assertEqual(MonthlyPointsArchive.objects.count(), 3)
+
+    def test_interrupted_reset_resumes(self):
+        MonthlyReset.objects.create(
+            year=2026,
+            month=9,
+            last_user_id=self.users[0].id,
+            achievement_bound=UserAchievement.objects.latest('id').id,
+        )
+        self.run_command()
+        self.users[0].refresh_from_db()
+        self.assertEqual(self.users[0].reward_points_for_current_month, 30)
+        self.assertEqual(MonthlyReset.objects.get().stage, MonthlyReset.DONE)
+        self.assertFalse(
+            MonthlyPointsArchive.objects.filter(user=self.users[0]).exists()
+        )
+
+    def test_archived_count_skips_existing_rows(self):
+        MonthlyPointsArchive.objects.create(
+            user=self.users[0],
+            year=2026,
+            month=9,
+            reward_points=30,
+            achievements_count=1,
+        )
+        output = self.run_command()
+        self.assertIn('в архиве 2 итогов', output)
+        self.assertEqual(MonthlyPointsArchive.objects.count(), 3)
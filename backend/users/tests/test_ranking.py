@@ -0,0 +1,161 @@
+import json
+
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from unittest.mock import MagicMock, patch
+from urllib.parse import parse_qs, urlparse
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.backends.postgresql.base import (
+    DatabaseWrapper as PostgreSQLDatabaseWrapper,
+)
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from scheduler.jobs import refresh_user_ranks
+from users import ranking
+from users.models import User, UserRank
+
+
+class RankingTest(TestCase):
+    """
+    Тестирование места пользователя в общем рейтинге.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        points = (50, 10, 50, 0, 30)
+        cls.users = [
+            User.objects.create(
+                email=f'user{number}@mail.ru',
+                first_name='User',
+                last_name='Userov',
+                password='password',
+                reward_points=value,
+                is_active=True,
+            )
+            for number, value in enumerate(points)
+        ]
+        User.objects.create(
+            email='inactive@mail.ru',
+            first_name='User',
+            last_name='Userov',
+            password='password',
+            reward_points=100,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def expected_ids(self):
+        return list(
+            User.objects.filter(is_active=True)
+            .order_by('-reward_points', 'email')
+            .values_list('id', flat=True)
+        )
+
+    def test_rating_matches_ordering(self):
+        for position, user_id in enumerate(self.expected_ids(), start=1):
+            user = User.objects.get(id=user_id)
+            self.assertEqual(ranking.get_rating(user), position)
+
+    @override_settings(USER_RANK_TABLE=True)
+    def test_rank_table_follows_points(self):
+        self.assertEqual(refresh_user_ranks(), 5)
+        last = User.objects.get(email='user3@mail.ru')
+        self.assertEqual(ranking.get_rating(last), 5)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            last.reward_points = 70
+            last.save()
+        # Запрос, меняющий баллы, таблицу мест не пересчитывает.
+        self.assertEqual(ranking.get_rating(last), 5)
+        refresh_user_ranks()
+        self.assertEqual(
+            list(UserRank.objects.order_by('rank').values_list('user_id')),
+            [(user_id,) for user_id in self.expected_ids()],
+        )
+        self.assertEqual(ranking.get_rating(last), 1)
+
+    def test_rank_table_disabled(self):
+        self.assertIsNone(refresh_user_ranks())
+        self.assertFalse(UserRank.objects.exists())
+
+    def test_refresh_locked_on_postgresql(self):
+        pg = PostgreSQLDatabaseWrapper(
+            {
+                **connection.settings_dict,
+                'ENGINE': 'django.db.backends.postgresql',
+            },
+            alias='postgresql',
+        )
+        cursor = MagicMock()
+        with patch.object(pg, 'cursor', return_value=cursor), patch(
+            'users.ranking.connection', pg
+        ):
+            ranking.lock_refresh()
+        cursor.__enter__.return_value.execute.assert_called_once_with(
+            'SELECT pg_advisory_xact_lock(%s)', [ranking.REFRESH_LOCK_ID]
+        )
+
+    def test_leaderboard_pages(self):
+        """
+        Места с одинаковыми баллами совпадают и на границе страниц.
+        """
+        client = APIClient()
+        client.force_authenticate(user=self.users[0])
+        response = client.get('/api/leaderboard/', {'page_size': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ranks = []
+        while True:
+            ranks += [
+                (user['rank'], user['reward_points'])
+                for user in response.data['results']
+            ]
+            if response.data['next'] is None:
+                break
+            response = client.get(response.data['next'])
+        self.assertEqual(ranks, [(1, 50), (1, 50), (3, 30), (4, 10), (5, 0)])
+
+    def test_leaderboard_cursor_is_signed(self):
+        client = APIClient()
+        client.force_authenticate(user=self.users[0])
+        response = client.get('/api/leaderboard/', {'page_size': 1})
+        cursor = parse_qs(urlparse(response.data['next']).query)['cursor'][0]
+        payload, signature = cursor.rsplit(':', 1)
+        position, _, offset = json.loads(urlsafe_b64decode(payload))
+        forged = urlsafe_b64encode(
+            json.dumps([position, 100, offset]).encode()
+        ).decode()
+        response = client.get(
+            '/api/leaderboard/',
+            {'page_size': 1, 'cursor': f'{forged}:{signature}'},
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_leaderboard_month(self):
+        User.objects.filter(email='user3@mail.ru').update(
+            reward_points_for_current_month=5
+        )
+        client = APIClient()
+        client.force_authenticate(user=self.users[0])
+        response = client.get('/api/leaderboard/', {'period': 'month'})
+        self.assertEqual(response.data['results'][0]['id'], self.users[3].id)
+        self.assertEqual(
+            [user['rank'] for user in response.data['results']],
+            [1, 2, 2, 2, 2],
+        )
+
+    def test_leaderboard_top_page_is_cached(self):
+        client = APIClient()
+        client.force_authenticate(user=self.users[0])
+        client.get('/api/leaderboard/')
+        User.objects.filter(id=self.users[3].id).update(reward_points=90)
+        response = client.get('/api/leaderboard/')
+        self.assertNotEqual(
+            response.data['results'][0]['id'], self.users[3].id
+        )
+        cache.clear()
+        response = client.get('/api/leaderboard/')
+        self.assertEqual(response.data['results'][0]['id'], self.users[3].id)
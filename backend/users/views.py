@@ -1,17 +1,27 @@
 from datetime import date
+from hashlib import md5
 
-from dateutil.relativedelta import relativedelta  # type: ignore
+from core.pagination import KeysetPagination, RankedKeysetPagination
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q, Sum
+from django.db.models.functions import Coalesce
 from django_filters.rest_framework import DjangoFilterBackend
 from djoser.views import UserViewSet
 from drf_spectacular.utils import extend_schema, extend_schema_view
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 
-from tasks.models import Task
+from tasks import stats
+from users import achievements as achievement_service
+from users import hardskills, ranking
+from users.authentication import token_cache
 from users.filters import UserFilter
-from users.models import Achievement, User, UserAchievement
+from users.models import Achievement, User
 from users.permissions import (
     IsAnonymous,
     IsAuthenticated,
@@ -20,11 +30,21 @@ from users.permissions import (
 )
 from users.schema import user_schema
 from users.serializers import (
+    AchievementBulkGrantSerializer,
+    AchievementGrantSerializer,
     AchievementSerializer,
     CustomUserRetrieveSerializer,
+    HardskillAutocompleteParamsSerializer,
+    HardskillAutocompleteSerializer,
+    LeaderboardParamsSerializer,
+    LeaderboardSerializer,
+    ProgressParamsSerializer,
     ProgressSerializer,
     ShortUserProfileSerializer,
+    SkillSearchParamsSerializer,
+    TokenCacheStatsSerializer,
     UploadUserImageSerializer,
+    UserListSerializer,
 )
 
 
@@ -34,6 +54,18 @@ class CustomDjUserViewSet(UserViewSet):
     serializer_class = CustomUserRetrieveSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_class = UserFilter
+    pagination_class = KeysetPagination
+    pagination_ordering = ('-reward_points', 'email')
+    # Действия, которые отдают список в формате UserListSerializer.
+    LIST_ACTIONS = ('list', 'by_skills')
+    # Колонки модели, которые читают вычисляемые поля UserListSerializer.
+    LIST_METHOD_COLUMNS = {
+        'experience': ('experience',),
+        'general_experience': ('general_experience',),
+        'remaining_tasks_count': ('completed_tasks_count',),
+        'total_tasks': (),
+        'achievements_read_only': (),
+    }
 
     def get_permissions(self):
         if self.action == 'create':
@@ -41,9 +73,11 @@ class CustomDjUserViewSet(UserViewSet):
         if self.action in [
             'retrieve',
             'list',
+            'by_skills',
             'update',
             'partial_update',
             'add_achievements',
+            'add_achievements_bulk',
         ]:
             return [IsTeamLeader()]
         if self.action == 'destroy':
@@ -55,13 +89,106 @@ class CustomDjUserViewSet(UserViewSet):
         return super().get_permissions()
 
     def get_queryset(self):
-        return User.objects.all()
+        if self.action not in self.LIST_ACTIONS:
+            return self.annotate_monthly_tasks(
+                User.objects.select_related(
+                    'contacts', 'department'
+                ).prefetch_related('hardskills', 'achievements')
+            )
+        fields = self.get_list_fields()
+        queryset = User.objects.all()
+        columns = {
+            'id',
+            *(name.lstrip('-') for name in type(self).pagination_ordering),
+        }
+        for name in fields:
+            if name in ('hardskills', 'achievements'):
+                queryset = queryset.prefetch_related(name)
+                continue
+            if name in ('contacts', 'department'):
+                queryset = queryset.select_related(name)
+            columns.update(self.LIST_METHOD_COLUMNS.get(name, (name,)))
+        if {'total_tasks', 'remaining_tasks_count'} & set(fields):
+            queryset = self.annotate_monthly_tasks(queryset)
+        queryset = queryset.only(*columns)
+        search = self.request.query_params.get('q', '').strip()
+        if search:
+            queryset = queryset.search(search)
+            self.pagination_ordering = ('-search_rank', 'email')
+        return queryset
+
+    @staticmethod
+    def annotate_monthly_tasks(queryset):
+        today = date.today()
+        return queryset.annotate(
+            monthly_tasks_count=Coalesce(
+                Sum(
+                    'task_stats__created',
+                    filter=Q(
+                        task_stats__year=today.year,
+                        task_stats__month=today.month,
+                    ),
+                ),
+                0,
+            )
+        )
+
+    def get_list_fields(self):
+        """Поля списка из параметра ?fields=id,email,..."""
+        fields = self.request.query_params.get('fields')
+        if not fields:
+            return UserListSerializer.DEFAULT_FIELDS
+        fields = tuple(
+            dict.fromkeys(
+                name.strip() for name in fields.split(',') if name.strip()
+            )
+        )
+        unknown = set(fields) - set(UserListSerializer.Meta.fields)
+        if unknown:
+            raise ValidationError(
+                {'fields': f'Неизвестные поля: {", ".join(sorted(unknown))}.'}
+            )
+        return fields
+
+    def get_serializer_class(self):
+        if self.action in self.LIST_ACTIONS:
+            return UserListSerializer
+        return super().get_serializer_class()
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action in self.LIST_ACTIONS:
+            context['fields'] = self.get_list_fields()
+        return context
+
+    def get_instance(self):
+        """
+        Пользователь перечитывается из базы: request.user может прийти из
+        кэша токенов, а баллы меняются через UPDATE с F() без сигналов.
+        """
+        return self.get_queryset().get(pk=self.request.user.pk)
 
     @action(methods=['get'], detail=False)
     def me(self, request, *args, **kwargs):
         self.get_object = self.get_instance
         return self.retrieve(request, *args, **kwargs)
 
+    @action(methods=['get'], detail=False)
+    def by_skills(self, request):
+        params = SkillSearchParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        queryset = self.get_queryset().filter(
+            id__in=hardskills.users_with_all_skills(
+                params.validated_data['all']
+            )
+        )
+        department = params.validated_data.get('department')
+        if department:
+            queryset = queryset.filter(department__name=department)
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
     def set_username(self, request, *args, **kwargs):
         pass
 
@@ -76,43 +203,19 @@ class CustomDjUserViewSet(UserViewSet):
 
     @action(methods=['get'], detail=False, serializer_class=ProgressSerializer)
     def progress(self, request):
+        params = ProgressParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        month = params.validated_data.get('month') or date.today()
         user = request.user
-        today = date.today()
-        start_of_month = today.replace(day=1)
-        next_month = start_of_month + relativedelta(months=1)
+        counts = stats.get_approved_counts(
+            month.year, month.month, user.id, user.department_id
+        )
 
         user_percentage = 0
         dep_percentage = 0
-
-        total_approved_tasks_count = Task.objects.filter(
-            deadline__gte=start_of_month,
-            deadline__lt=next_month,
-            status=Task.APPROVED,
-        ).count()
-
-        if total_approved_tasks_count > 0:
-            user_approved_tasks_count = Task.objects.filter(
-                deadline__gte=start_of_month,
-                deadline__lt=next_month,
-                assigned_to=user.id,
-                status=Task.APPROVED,
-            ).count()
-            user_percentage = round(
-                100 * (user_approved_tasks_count / total_approved_tasks_count)
-            )
-
-            department = user.department
-            if department is not None:
-                dep_approved_tasks_count = Task.objects.filter(
-                    deadline__gte=start_of_month,
-                    deadline__lt=next_month,
-                    status=Task.APPROVED,
-                    department=department,
-                ).count()
-                dep_percentage = round(
-                    100
-                    * (dep_approved_tasks_count / total_approved_tasks_count)
-                )
+        if counts.total > 0:
+            user_percentage = round(100 * (counts.user / counts.total))
+            dep_percentage = round(100 * (counts.department / counts.total))
 
         data = {
             'personal_progress': user_percentage,
@@ -141,39 +244,60 @@ class CustomDjUserViewSet(UserViewSet):
         user.save()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
-    @action(detail=True, methods=['patch'])
+    @action(
+        detail=True,
+        methods=['patch'],
+        serializer_class=AchievementGrantSerializer,
+    )
     def add_achievements(self, request, id):
         user = self.get_object()
-        achievements_data = request.data.get('achievements', [])
-        for achievement_data in achievements_data:
-            achievement, created = Achievement.objects.get_or_create(
-                name=achievement_data['name'],
-                value=achievement_data['value'],
-                defaults={
-                    'description': achievement_data.get('description', '')
-                },
+        serializer = AchievementGrantSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return self.grant_achievements(serializer.validated_data, [user.id])
+
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='add_achievements',
+        serializer_class=AchievementBulkGrantSerializer,
+    )
+    def add_achievements_bulk(self, request):
+        serializer = AchievementBulkGrantSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return self.grant_achievements(
+            serializer.validated_data, serializer.validated_data['users']
+        )
+
+    def grant_achievements(self, data, user_ids):
+        """
+        Выдает достижения и сообщает по каждому пользователю, какие
+        достижения выданы сейчас, а какие уже были.
+        """
+        with transaction.atomic():
+            achievements = achievement_service.get_or_create_achievements(
+                data['achievements']
+            )
+            granted = achievement_service.grant_achievements(
+                user_ids, list(achievements.values())
             )
-            if 'image' in achievement_data:
-                achievement.image = achievement_data['image']
-            achievement.save()
-            try:
-                (
-                    user_achievement,
-                    created,
-                ) = UserAchievement.objects.get_or_create(
-                    user=user, achievement=achievement, defaults={}
+        results = []
+        for user_id in dict.fromkeys(user_ids):
+            if user_id not in granted:
+                results.append(
+                    {'user': user_id, 'error': 'Пользователь не найден.'}
                 )
-                if created:
-                    user.reward_points = user.reward_points + achievement.value
-                    user.reward_points_for_current_month = (
-                        user.reward_points_for_current_month
-                        + achievement.value
-                    )
-            except Exception:
-                pass
-        user.save()
-        serializer = self.get_serializer(user)
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+                continue
+            new = {achievement.name for achievement in granted[user_id]}
+            results.append(
+                {
+                    'user': user_id,
+                    'granted': [name for name in achievements if name in new],
+                    'already_granted': [
+                        name for name in achievements if name not in new
+                    ],
+                }
+            )
+        return Response({'results': results}, status=status.HTTP_200_OK)
 
 
 @extend_schema(**user_schema.short_user_profile, tags=['Users'])
@@ -185,6 +309,64 @@ class ShortUserProfileViewSet(viewsets.ReadOnlyModelViewSet):
         return User.objects.filter(id=self.request.user.id)
 
 
+@extend_schema(**user_schema.leaderboard, tags=['Users'])
+class LeaderboardViewSet(viewsets.GenericViewSet):
+    serializer_class = LeaderboardSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = RankedKeysetPagination
+
+    def list(self, request):
+        params = LeaderboardParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        cache_key = self.get_cache_key(request)
+        data = cache.get(cache_key)
+        if data is not None:
+            return Response(data)
+
+        queryset, self.pagination_ordering = ranking.get_leaderboard(
+            **params.validated_data
+        )
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        response = self.get_paginated_response(serializer.data)
+        if self.paginator.offset < settings.LEADERBOARD_CACHE_ROWS:
+            cache.set(
+                cache_key, response.data, settings.LEADERBOARD_CACHE_TIMEOUT
+            )
+        return response
+
+    @staticmethod
+    def get_cache_key(request):
+        url = request.build_absolute_uri()
+        return f'leaderboard:{md5(url.encode()).hexdigest()}'
+
+
+@extend_schema(**user_schema.hardskills, tags=['Users'])
+class HardskillViewSet(viewsets.GenericViewSet):
+    serializer_class = HardskillAutocompleteSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def list(self, request):
+        params = HardskillAutocompleteParamsSerializer(
+            data=request.query_params
+        )
+        params.is_valid(raise_exception=True)
+        serializer = self.get_serializer(
+            hardskills.search_hardskills(params.validated_data['q']),
+            many=True,
+        )
+        return Response(serializer.data)
+
+
+@extend_schema(**user_schema.token_cache_stats, tags=['Users'])
+class TokenCacheStatsViewSet(viewsets.GenericViewSet):
+    serializer_class = TokenCacheStatsSerializer
+    permission_classes = [IsAdminUser]
+
+    def list(self, request):
+        return Response(self.get_serializer(token_cache.stats()).data)
+
+
 @extend_schema(tags=['Achivements'])
 class AchivementsViewSet(viewsets.ModelViewSet):
     queryset = Achievement.objects.all()